@@ -1,11 +1,29 @@
+"""
+Dataset builder: fetches ENTSO-E load and Open-Meteo temperature and aligns
+them with calendar features.
+
+The API clients (and with them `config`, entsoe-py and requests) are only
+imported when a dataset is actually built, so importing this module, or
+running read-only commands of `cli`, stays cheap.
+"""
+
+import sys
+from pathlib import Path
+from typing import TYPE_CHECKING, Callable
+
 import numpy as np
 import pandas as pd
 
-from config import ENTSOE_TOKEN
-from enstoe_client import EntsoeHourlyClient
-from open_meteo_client import OpenMeteoClient
+import imputation
+from dataset_store import Manifest, partition_path, time_windows, write_partition
+from profiler import profiled, stage
 
+if TYPE_CHECKING:
+    from enstoe_client import EntsoeHourlyClient
+    from open_meteo_client import OpenMeteoClient
 
+
+@profiled()
 def index_to_time_features(index: pd.DatetimeIndex) -> pd.DataFrame:
     day = index.day
     month = index.month
@@ -31,20 +49,25 @@ def index_to_time_features(index: pd.DatetimeIndex) -> pd.DataFrame:
 def build_dataset(
     start: pd.Timestamp,
     end: pd.Timestamp,
+    entsoe_client: "EntsoeHourlyClient | None" = None,
+    open_meteo_client: "OpenMeteoClient | None" = None,
+    impute: bool = False,
 ) -> pd.DataFrame:
     """
     Build a dataset combining electricity prices from ENTSO-E and weather data from Open-Meteo.
 
     Parameters
     ----------
-    entsoe_client : EntsoeHourlyClient
-        Client to fetch electricity prices.
-    open_meteo_client : OpenMeteoClient
-        Client to fetch weather data.
     start : pd.Timestamp
         Start time (tz-aware).
     end : pd.Timestamp
         End time (tz-aware).
+    entsoe_client : EntsoeHourlyClient, optional
+        Client to fetch electricity prices. Created from config by default.
+    open_meteo_client : OpenMeteoClient, optional
+        Client to fetch weather data. Created from config by default.
+    impute : bool
+        Fill the gaps of 'load' and 'temp' (see `imputation.impute`).
     Returns
     -------
     pd.DataFrame
@@ -54,14 +77,153 @@ def build_dataset(
     if start.tzinfo is None or end.tzinfo is None:
         raise ValueError("Both `start` and `end` must be timezone-aware Timestamps.")
 
-    entsoe = EntsoeHourlyClient(api_key=ENTSOE_TOKEN)
+    entsoe, meteo = _default_clients(entsoe_client, open_meteo_client)
+    df = _build_window(entsoe, meteo, start, end)
+    if impute:
+        df, _ = imputation.impute(df, columns=["load", "temp"], freq=None)
+    return df
+
+
+def build_dataset_chunked(
+    start: pd.Timestamp,
+    end: pd.Timestamp,
+    path: str | Path,
+    chunk_freq: str = "MS",
+    verify_checksums: bool = False,
+    entsoe_client: "EntsoeHourlyClient | None" = None,
+    open_meteo_client: "OpenMeteoClient | None" = None,
+) -> list[Path]:
+    """
+    Streaming, resumable version of `build_dataset`: the range is processed in
+    time-ordered windows (one month by default) which are fetched, aligned,
+    featurized and written as one partition each under `path`.
 
-    load = entsoe.get_hourly_load(start, end)
+    Every source chunk ('load', 'temp') is persisted as soon as it is fetched
+    and recorded in `path/manifest.json`. Rerunning the same command only
+    fetches the chunks that are missing or failed, the others are read from
+    disk. With `verify_checksums`, recorded chunks whose file no longer
+    matches its checksum are fetched again.
+
+    Peak memory is bounded by one window. Reading the partitions back with
+    `dataset_store.read_dataset` gives the same frame as `build_dataset`.
+    Partitions left by a previous build with another window layout (other
+    `start` or `chunk_freq`) are deleted when a new window overlaps them.
+    `chunk_freq` is recorded in the manifest, for `cli update` to reuse it.
+
+    The clients are created from config by default, see `build_dataset`.
+
+    Returns
+    -------
+    list[Path]
+        Dataset partitions, in time order.
+
+    Raises
+    ------
+    RuntimeError
+        If some windows failed. All other windows are completed first, so
+        rerunning the build resumes from the failed ones.
+    """
+    if start.tzinfo is None or end.tzinfo is None:
+        raise ValueError("Both `start` and `end` must be timezone-aware Timestamps.")
 
-    meteo = OpenMeteoClient()
+    entsoe, meteo = _default_clients(entsoe_client, open_meteo_client)
+    fetchers = {
+        "load": lambda s, e: entsoe.get_hourly_load(s, e),
+        "temp": lambda s, e: meteo.get_averaged(s, e).to_frame(),
+    }
+    manifest = Manifest(path)
+    if manifest.chunk_freq != chunk_freq:
+        manifest.chunk_freq = chunk_freq
+        manifest.save()
 
-    temp = meteo.get_averaged(start, end)
+    paths, failures = [], []
+    for window_start, window_end in time_windows(start, end, freq=chunk_freq):
+        try:
+            fetched = False
+            sources = {}
+            for source, fetch in fetchers.items():
+                sources[source], refetched = _checkpointed_chunk(
+                    manifest, source, window_start, window_end, fetch, verify_checksums
+                )
+                fetched = fetched or refetched
 
+            if fetched or not manifest.is_complete(
+                "dataset", window_start, window_end, verify_checksums
+            ):
+                df = _assemble(sources["load"], sources["temp"]["temp"])
+                manifest.discard_overlapping("dataset", window_start, window_end)
+                manifest.record(
+                    "dataset",
+                    window_start,
+                    window_end,
+                    write_partition(path, window_start, df),
+                )
+            paths.append(partition_path(path, window_start))
+        # Network errors, expired tokens, rate limits... The window is retried
+        # on the next run.
+        except Exception as e:
+            failures.append((window_start, e))
+
+    if failures:
+        details = "\n".join(f"  {w.isoformat()}: {e!r}" for w, e in failures)
+        raise RuntimeError(
+            f"{len(failures)} window(s) failed, rerun to resume:\n{details}"
+        ) from failures[0][1]
+    return paths
+
+
+def _checkpointed_chunk(
+    manifest: Manifest,
+    source: str,
+    start: pd.Timestamp,
+    end: pd.Timestamp,
+    fetch: Callable[[pd.Timestamp, pd.Timestamp], pd.DataFrame],
+    verify: bool,
+) -> tuple[pd.DataFrame, bool]:
+    """Read a source chunk from disk if complete, else fetch and persist it."""
+    if manifest.is_complete(source, start, end, verify):
+        return pd.read_parquet(partition_path(manifest.root, start, source)), False
+
+    with stage(f"fetch.{source}"):
+        df = fetch(start, end)
+    manifest.discard_overlapping(source, start, end)
+    path = write_partition(manifest.root, start, df, source)
+    manifest.record(source, start, end, path)
+    return df, True
+
+
+def _default_clients(
+    entsoe_client: "EntsoeHourlyClient | None" = None,
+    open_meteo_client: "OpenMeteoClient | None" = None,
+) -> tuple["EntsoeHourlyClient", "OpenMeteoClient"]:
+    """Clients created from config, for the ones that are not given."""
+    if entsoe_client is None:
+        from config import ENTSOE_TOKEN
+        from enstoe_client import EntsoeHourlyClient
+
+        entsoe_client = EntsoeHourlyClient(api_key=ENTSOE_TOKEN)
+    if open_meteo_client is None:
+        from open_meteo_client import OpenMeteoClient
+
+        open_meteo_client = OpenMeteoClient()
+    return entsoe_client, open_meteo_client
+
+
+def _build_window(
+    entsoe: "EntsoeHourlyClient",
+    meteo: "OpenMeteoClient",
+    start: pd.Timestamp,
+    end: pd.Timestamp,
+) -> pd.DataFrame:
+    with stage("fetch.load"):
+        load = entsoe.get_hourly_load(start, end)
+    with stage("fetch.temp"):
+        temp = meteo.get_averaged(start, end)
+    return _assemble(load, temp)
+
+
+@profiled("assemble")
+def _assemble(load: pd.DataFrame, temp: pd.Series) -> pd.DataFrame:
     idx = load.index.intersection(temp.index)
     df = index_to_time_features(idx)
     df["load"] = load.reindex(idx)
@@ -72,8 +234,6 @@ def build_dataset(
 
 
 if __name__ == "__main__":
-    start = pd.Timestamp("2020-01-01", tz="CET")
-    end = pd.Timestamp("2025-11-05", tz="CET")
-    print("Building dataset from", start, "to", end)
-    df = build_dataset(start, end)
-    print(df)
+    from cli import main
+
+    sys.exit(main(["build", *sys.argv[1:]]))
@@ -0,0 +1,215 @@
+"""
+Command line entry point::
+
+    python -m cli build --start 2020-01-01 --end 2025-11-05 --out data/dataset
+    python -m cli update data/dataset
+    python -m cli load data/dataset --start 2025-01-01 --csv load.csv
+    python -m cli forecast data/dataset --horizon 48 --season 7D
+
+Only argparse is imported at startup. pandas, the dataset store and the API
+clients (with `config`, entsoe-py and requests) are imported by the
+subcommands that need them: `load` and `forecast` read a stored dataset and
+never import the clients nor the config.
+"""
+
+import argparse
+import sys
+
+TZ = "CET"
+DEFAULT_START = "2020-01-01"
+DEFAULT_END = "2025-11-05"
+DEFAULT_CHUNK_FREQ = "MS"
+
+
+def _timestamp(value: str | None):
+    import pandas as pd
+
+    return None if value is None else pd.Timestamp(value, tz=TZ)
+
+
+def _output(df, csv: str | None) -> None:
+    if csv:
+        df.to_csv(csv)
+        print(f"{len(df)} rows written to {csv}")
+    else:
+        print(df)
+
+
+# ---------- subcommands ----------
+def _build(args: argparse.Namespace) -> int:
+    from builder import build_dataset, build_dataset_chunked
+
+    start, end = _timestamp(args.start), _timestamp(args.end)
+    print("Building dataset from", start, "to", end)
+    if args.out:
+        paths = build_dataset_chunked(
+            start,
+            end,
+            args.out,
+            chunk_freq=args.chunk_freq,
+            verify_checksums=args.verify_checksums,
+        )
+        print(f"{len(paths)} partitions in {args.out}")
+    else:
+        _output(build_dataset(start, end, impute=args.impute), args.csv)
+    return 0
+
+
+def _update(args: argparse.Namespace) -> int:
+    import pandas as pd
+
+    from builder import build_dataset_chunked
+    from dataset_store import Manifest
+
+    manifest = Manifest(args.path)
+    start = manifest.first_window()
+    if start is None:
+        print(f"No chunked build found in {args.path}", file=sys.stderr)
+        return 1
+    # other windows than the build's would all be refetched
+    chunk_freq = args.chunk_freq or manifest.chunk_freq or DEFAULT_CHUNK_FREQ
+    if manifest.chunk_freq is not None and chunk_freq != manifest.chunk_freq:
+        print(
+            f"{args.path} was built with --chunk-freq {manifest.chunk_freq}, "
+            f"not {chunk_freq}",
+            file=sys.stderr,
+        )
+        return 1
+
+    start = start.tz_convert(TZ)
+    end = _timestamp(args.end) or pd.Timestamp.now(tz=TZ).floor("h")
+    print("Updating dataset from", start, "to", end)
+    paths = build_dataset_chunked(
+        start,
+        end,
+        args.path,
+        chunk_freq=chunk_freq,
+        verify_checksums=args.verify_checksums,
+    )
+    print(f"{len(paths)} partitions in {args.path}")
+    return 0
+
+
+def _load(args: argparse.Namespace) -> int:
+    from dataset_store import read_dataset
+
+    df = read_dataset(args.path, _timestamp(args.start), _timestamp(args.end), TZ)
+    if args.impute:
+        from imputation import impute
+
+        df, gaps = impute(df, columns=["load", "temp"], freq=None)
+        print(f"{len(gaps)} gaps filled", file=sys.stderr)
+    _output(df, args.csv)
+    return 0
+
+
+def seasonal_naive(series, horizon: int, season: str = "1D"):
+    """
+    Forecast the `horizon` hours following `series` by repeating its last
+    season: every hour takes the value observed one season earlier (or a
+    multiple of it, for horizons longer than one season).
+
+    Parameters
+    ----------
+    series : pd.Series
+        Hourly history, with a DatetimeIndex.
+    horizon : int
+        Number of hours to forecast.
+    season : str
+        Seasonal period, e.g. '1D' (same hour yesterday) or '7D' (same hour
+        last week).
+
+    Returns
+    -------
+    pd.Series
+    """
+    import numpy as np
+    import pandas as pd
+
+    period = pd.Timedelta(season)
+    last = series.index[-1]
+    index = pd.date_range(last + pd.Timedelta("1h"), periods=horizon, freq="1h")
+    seasons_back = np.ceil((index - last) / period)
+    values = series.reindex(index - seasons_back * period).to_numpy()
+    return pd.Series(values, index=index, name=series.name)
+
+
+def _forecast(args: argparse.Namespace) -> int:
+    import pandas as pd
+
+    from dataset_store import read_dataset
+
+    df = read_dataset(args.path, tz=TZ)
+    history = df[args.column].dropna()
+    if history.empty:
+        print(f"No '{args.column}' data in {args.path}", file=sys.stderr)
+        return 1
+    forecast = seasonal_naive(history, args.horizon, args.season)
+    _output(pd.DataFrame({f"{args.column}_forecast": forecast}), args.csv)
+    return 0
+
+
+# ---------- parser ----------
+def make_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m cli", description=__doc__)
+    parser.formatter_class = argparse.RawDescriptionHelpFormatter
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    build = commands.add_parser("build", help="Build the load/temperature dataset.")
+    build.add_argument("--start", default=DEFAULT_START)
+    build.add_argument("--end", default=DEFAULT_END)
+    build.add_argument(
+        "--out",
+        help="Directory of a chunked, resumable build. "
+        "Without it the dataset is built in memory and printed.",
+    )
+    build.add_argument("--chunk-freq", default=DEFAULT_CHUNK_FREQ)
+    build.add_argument(
+        "--verify-checksums",
+        action="store_true",
+        help="Refetch checkpointed chunks whose checksum does not match.",
+    )
+    build.add_argument(
+        "--impute", action="store_true", help="Fill gaps (in-memory build only)."
+    )
+    build.add_argument("--csv", help="Write the in-memory build to this file.")
+    build.set_defaults(func=_build)
+
+    update = commands.add_parser(
+        "update", help="Resume or extend a chunked build up to --end (now)."
+    )
+    update.add_argument("path")
+    update.add_argument("--end")
+    update.add_argument("--chunk-freq", help="Defaults to the frequency of the build.")
+    update.add_argument("--verify-checksums", action="store_true")
+    update.set_defaults(func=_update)
+
+    load = commands.add_parser("load", help="Read a stored dataset.")
+    load.add_argument("path")
+    load.add_argument("--start")
+    load.add_argument("--end")
+    load.add_argument("--impute", action="store_true", help="Fill gaps.")
+    load.add_argument("--csv", help="Write the dataset to this file.")
+    load.set_defaults(func=_load)
+
+    forecast = commands.add_parser(
+        "forecast", help="Seasonal naive forecast from a stored dataset."
+    )
+    forecast.add_argument("path")
+    forecast.add_argument("--column", default="load")
+    forecast.add_argument("--horizon", type=int, default=24, help="Hours.")
+    forecast.add_argument(
+        "--season", default="1D", help="'1D': same hour yesterday, '7D': last week."
+    )
+    forecast.add_argument("--csv", help="Write the forecast to this file.")
+    forecast.set_defaults(func=_forecast)
+    return parser
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = make_parser().parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,232 @@
+"""
+Partitioned on-disk storage for datasets built chunk by chunk.
+
+Layout::
+
+    <root>/year=<YYYY>/part-<window start, UTC>.parquet
+    <root>/sources/<source>/year=<YYYY>/part-<window start, UTC>.parquet
+    <root>/manifest.json
+
+Each partition holds one time window, so a build only ever keeps one window
+in memory and readers can load a sub-range without scanning the whole history.
+Raw source chunks are checkpointed next to the dataset and listed with their
+checksum in the manifest, so an interrupted backfill only refetches what is
+missing.
+"""
+
+import hashlib
+import json
+from pathlib import Path
+
+import pandas as pd
+
+from profiler import profiled
+
+PARTITION_FORMAT = "%Y%m%dT%H%M"
+MANIFEST_NAME = "manifest.json"
+
+
+def time_windows(
+    start: pd.Timestamp, end: pd.Timestamp, freq: str = "MS"
+) -> list[tuple[pd.Timestamp, pd.Timestamp]]:
+    """
+    Split [start, end) into consecutive windows aligned on `freq`
+    (month starts by default) in the timezone of `start`.
+    """
+    if start.tzinfo is None or end.tzinfo is None:
+        raise ValueError("Both `start` and `end` must be timezone-aware Timestamps.")
+    if start >= end:
+        return []
+
+    inner = pd.date_range(start, end, freq=freq, inclusive="neither")
+    bounds = [start, *inner, end]
+    return list(zip(bounds[:-1], bounds[1:]))
+
+
+def partition_path(
+    root: str | Path, window_start: pd.Timestamp, source: str | None = None
+) -> Path:
+    """Path of the dataset partition, or of a raw `source` chunk."""
+    utc = window_start.tz_convert("UTC")
+    base = Path(root) if source is None else Path(root) / "sources" / source
+    return base / f"year={utc.year}" / f"part-{utc.strftime(PARTITION_FORMAT)}.parquet"
+
+
+@profiled()
+def write_partition(
+    root: str | Path,
+    window_start: pd.Timestamp,
+    df: pd.DataFrame,
+    source: str | None = None,
+) -> Path:
+    """Write one window atomically (a crash never leaves a half-written file)."""
+    path = partition_path(root, window_start, source)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".tmp")
+    df.to_parquet(tmp)
+    tmp.replace(path)
+    return path
+
+
+def read_dataset(
+    root: str | Path,
+    start: pd.Timestamp | None = None,
+    end: pd.Timestamp | None = None,
+    tz: str = "CET",
+) -> pd.DataFrame:
+    """
+    Read the partitions overlapping [start, end) and concatenate them.
+
+    Partitions are selected from their file name, so only the needed files
+    are opened.
+
+    Raises
+    ------
+    FileNotFoundError
+        If there is no partition under `root`.
+    ValueError
+        If partitions overlap (duplicate timestamps).
+    """
+    paths = sorted(Path(root).glob("year=*/part-*.parquet"))
+    if not paths:
+        raise FileNotFoundError(f"No dataset partition found in {root}")
+
+    starts = pd.to_datetime(
+        [p.stem.removeprefix("part-") for p in paths], format=PARTITION_FORMAT
+    ).tz_localize("UTC")
+    selected = []
+    for i, path in enumerate(paths):
+        if end is not None and starts[i] >= end:
+            continue
+        # the window of a partition ends where the next one starts
+        if start is not None and i + 1 < len(paths) and starts[i + 1] <= start:
+            continue
+        selected.append(path)
+
+    if not selected:
+        return pd.read_parquet(paths[0]).iloc[:0].tz_convert(tz)
+
+    df = pd.concat([pd.read_parquet(p) for p in selected])
+    if df.index.has_duplicates:
+        raise ValueError(
+            f"Duplicate timestamps in {root}: partitions overlap, rebuild it."
+        )
+    df.index = df.index.tz_convert(tz)
+    if start is not None:
+        df = df[df.index >= start]
+    if end is not None:
+        df = df[df.index < end]
+    return df
+
+
+def file_checksum(path: str | Path) -> str:
+    """SHA-256 of a file, read by blocks."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class Manifest:
+    """
+    Record of the (source, window) chunks already persisted under `root`,
+    and of the window frequency (`chunk_freq`) of the build that wrote them.
+
+    The manifest is rewritten atomically after every chunk, so it always
+    describes files that are fully on disk.
+    """
+
+    def __init__(self, root: str | Path) -> None:
+        self.root = Path(root)
+        self.path = self.root / MANIFEST_NAME
+        try:
+            with open(self.path, "r") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            data = {"chunks": {}}
+        self.chunks: dict[str, dict] = data["chunks"]
+        self.chunk_freq: str | None = data.get("chunk_freq")
+
+    @staticmethod
+    def key(source: str, window_start: pd.Timestamp) -> str:
+        return f"{source}/{window_start.tz_convert('UTC').strftime(PARTITION_FORMAT)}"
+
+    def is_complete(
+        self,
+        source: str,
+        window_start: pd.Timestamp,
+        window_end: pd.Timestamp,
+        verify: bool = False,
+    ) -> bool:
+        """
+        Whether the chunk of [window_start, window_end) was recorded and its
+        file is still there. A chunk recorded for another end (e.g. the
+        partial last window of a build run up to "now") is not complete.
+        With `verify`, the file checksum must also match the recorded one.
+        """
+        entry = self.chunks.get(self.key(source, window_start))
+        if entry is None or pd.Timestamp(entry["window_end"]) != window_end:
+            return False
+        path = self.root / entry["path"]
+        if not path.exists():
+            return False
+        return not verify or file_checksum(path) == entry["sha256"]
+
+    def record(
+        self,
+        source: str,
+        window_start: pd.Timestamp,
+        window_end: pd.Timestamp,
+        path: Path,
+    ) -> None:
+        self.chunks[self.key(source, window_start)] = {
+            "path": str(path.relative_to(self.root)),
+            "sha256": file_checksum(path),
+            "window_start": window_start.isoformat(),
+            "window_end": window_end.isoformat(),
+        }
+        self.save()
+
+    def discard_overlapping(
+        self, source: str, window_start: pd.Timestamp, window_end: pd.Timestamp
+    ) -> None:
+        """
+        Delete the chunks of `source` recorded for another window that
+        overlaps [window_start, window_end), left over from a build with
+        another window layout.
+        """
+        own = self.key(source, window_start)
+        stale = [
+            key
+            for key, entry in self.chunks.items()
+            if key.startswith(f"{source}/")
+            and key != own
+            and pd.Timestamp(entry["window_start"]) < window_end
+            and pd.Timestamp(entry["window_end"]) > window_start
+        ]
+        for key in stale:
+            (self.root / self.chunks.pop(key)["path"]).unlink(missing_ok=True)
+        if stale:
+            self.save()
+
+    def first_window(self, source: str = "dataset") -> pd.Timestamp | None:
+        """Start of the earliest recorded window of `source`, None if empty."""
+        starts = [
+            pd.Timestamp(entry["window_start"])
+            for key, entry in self.chunks.items()
+            if key.startswith(f"{source}/")
+        ]
+        return min(starts) if starts else None
+
+    def save(self) -> None:
+        self.root.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(".tmp")
+        with open(tmp, "w") as f:
+            json.dump(
+                {"chunk_freq": self.chunk_freq, "chunks": self.chunks},
+                f,
+                indent=2,
+                sort_keys=True,
+            )
+        tmp.replace(self.path)
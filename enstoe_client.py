@@ -1,13 +1,24 @@
+import copy
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
 import pandas as pd
+import requests
 from entsoe import EntsoePandasClient
+from entsoe import entsoe as entsoe_api
+from entsoe.exceptions import NoMatchingDataError
 
-from utils import format_ts
+from profiler import stage
+from rate_limiter import get_limiter
+from utils import format_ts, resolution_segments, to_hourly
 
 # from this date EntsoePandasClient sends 15 min load data
 THRESHOLD = pd.Timestamp("2024-12-31 00:00:00", tz="UTC")
 COUNTRY_CODE = "FR"
 ONE_HOUR = pd.Timedelta("1h")
 FIFTEEN_MINUTES = pd.Timedelta("15min")
+MAX_WORKERS = 4
 
 
 class EntsoeHourlyClient(EntsoePandasClient):
@@ -19,7 +30,40 @@ class EntsoeHourlyClient(EntsoePandasClient):
     threshold = THRESHOLD
     code = COUNTRY_CODE
 
-    def get_hourly_load(self, start: pd.Timestamp, end: pd.Timestamp) -> pd.Series:
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        # native resolution segments of the last single-query fetch, per zone
+        self.resolutions: dict[str, pd.DataFrame] = {}
+
+    def _base_request(self, params, start, end):
+        # Every HTTP call (entsoe splits long queries per month) shares the
+        # ENTSO-E limiter with the other clients of the process, and is
+        # retried when throttled.
+        base_request = super()._base_request
+
+        def send():
+            with stage("http.entsoe"):
+                return base_request(params, start, end)
+
+        return get_limiter(entsoe_api.URL).call(send)
+
+    def get_hourly_load(
+        self,
+        start: pd.Timestamp,
+        end: pd.Timestamp,
+        detect_resolution: bool = False,
+        country_code: str | None = None,
+    ) -> pd.Series:
+        """
+        Hourly realised load between start and end (UTC index).
+
+        With ``detect_resolution=True``, a single query is issued for the whole
+        range and the native resolution of each segment is read from the
+        returned index instead of relying on ``THRESHOLD``, which only holds
+        for France. It is always used when ``country_code`` is another zone
+        than ``COUNTRY_CODE``. The detected segments (see
+        `utils.resolution_segments`) are kept in ``self.resolutions[zone]``.
+        """
         if start.tzinfo is None or end.tzinfo is None:
             raise ValueError("start and end timestamps must be timezone-aware")
 
@@ -27,14 +71,18 @@ class EntsoeHourlyClient(EntsoePandasClient):
         start = start.tz_convert("UTC")
         end = end.tz_convert("UTC")
 
-        if end <= self.threshold:
+        code = country_code or self.code
+        if detect_resolution or code != self.code:
+            ts = self._get_hourly_load_single_query(code, start, end)
+        elif end <= self.threshold:
             ts = super().query_load(self.code, start=start, end=end)
             ts = format_ts(ts, start=start, end=end, include_start=False)
 
         elif start >= self.threshold:
             ts = super().query_load(self.code, start=start, end=end)
             ts = format_ts(ts, start=start, end=end, include_start=False, freq="15min")
-            ts = ts.resample("1h").mean()
+            with stage("resample"):
+                ts = ts.resample("1h").mean()
         else:
             ts_before = super().query_load(self.code, start=start, end=self.threshold)
             ts_before = format_ts(
@@ -49,7 +97,8 @@ class EntsoeHourlyClient(EntsoePandasClient):
                 include_start=False,
                 freq="15min",
             )
-            ts_after = ts_after.resample("1h").mean()
+            with stage("resample"):
+                ts_after = ts_after.resample("1h").mean()
 
             ts = pd.concat([ts_before, ts_after])
             ts = ts[~ts.index.duplicated(keep="last")]
@@ -57,6 +106,88 @@ class EntsoeHourlyClient(EntsoePandasClient):
 
         return ts.rename(columns={"Actual Load": "load"})
 
+    def get_hourly_loads(
+        self,
+        zones: list[str],
+        start: pd.Timestamp,
+        end: pd.Timestamp,
+        max_workers: int = MAX_WORKERS,
+    ) -> pd.DataFrame:
+        """
+        Fetch the hourly load of several bidding zones concurrently.
+
+        Parameters
+        ----------
+        zones : list[str]
+            Zone codes understood by entsoe-py, e.g. ["FR", "DE_LU", "BE", "CH"].
+        start : pd.Timestamp
+            Start time (tz-aware).
+        end : pd.Timestamp
+            End time (tz-aware), excluded.
+        max_workers : int
+            Number of zones fetched in parallel. Requests are still subject to
+            the shared ENTSO-E rate limiter.
+
+        Returns
+        -------
+        pd.DataFrame
+            Hourly UTC index covering [start, end), one column per zone. Zones
+            without data in the range are left NaN.
+        """
+        if start.tzinfo is None or end.tzinfo is None:
+            raise ValueError("start and end timestamps must be timezone-aware")
+
+        start = start.tz_convert("UTC")
+        end = end.tz_convert("UTC")
+
+        # requests sessions are not thread-safe: one client copy per worker
+        local = threading.local()
+        workers = []
+
+        def fetch(zone: str) -> pd.DataFrame | None:
+            if not hasattr(local, "client"):
+                local.client = self._with_own_session()
+                workers.append(local.client)
+            try:
+                return local.client.get_hourly_load(
+                    start, end, detect_resolution=True, country_code=zone
+                )
+            except NoMatchingDataError:
+                return None
+
+        index = pd.date_range(start.ceil("h"), end, freq="1h", inclusive="left")
+        values = np.full((len(index), len(zones)), np.nan)
+        try:
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                results = list(executor.map(fetch, zones))
+        finally:
+            for worker in workers:
+                worker.session.close()
+
+        for col, ts in enumerate(results):
+            if ts is not None:
+                positions = index.get_indexer(ts.index)
+                found = positions >= 0
+                values[positions[found], col] = ts["load"].to_numpy()[found]
+
+        return pd.DataFrame(values, index=index, columns=list(zones))
+
+    def _with_own_session(self) -> "EntsoeHourlyClient":
+        """Shallow copy of the client using a new HTTP session."""
+        client = copy.copy(self)
+        client.session = requests.Session()
+        client.session.headers.update(self.session.headers)
+        return client
+
+    def _get_hourly_load_single_query(
+        self, code: str, start: pd.Timestamp, end: pd.Timestamp
+    ) -> pd.DataFrame:
+        raw = super().query_load(code, start=start, end=end)
+        raw = raw.tz_convert("UTC")
+        self.resolutions[code] = resolution_segments(raw.index)
+        ts = to_hourly(raw)
+        return format_ts(ts, start=start, end=end, include_start=False)
+
 
 if __name__ == "__main__":
     from config import ENTSOE_TOKEN
@@ -0,0 +1,311 @@
+"""
+Local stand-in for the ENTSO-E, RTE and Open-Meteo APIs, for load tests.
+
+One server emulates the three contracts the clients rely on:
+
+- ENTSO-E ``GET /api`` (documentType A65): GL_MarketDocument XML, hourly
+  before ``THRESHOLD`` and 15-min after, like the real platform,
+- RTE ``POST .../token/oauth/`` (OAuth2 client_credentials), ``GET
+  .../short_term`` (consumption) and ``GET .../france_power_exchanges``,
+- Open-Meteo ``GET /v1/archive`` (hourly temperature_2m).
+
+Consumption values are the daily profiles of ``data/france_consumption.json``
+replayed over the requested days, power exchanges are served from
+``data/france_power_exchanges.json``. With ``FakeAPIConfig.recorded_dir``
+(e.g. ``tests/json``), the RTE endpoints answer the recorded payloads of
+that directory verbatim instead: they only cover a few points of one day,
+too little for load tests but exactly what the real API returned. Latency, error and throttling rates,
+a request-rate quota (answered with 429 + Retry-After) and extra payload
+bytes are configurable with ``FakeAPIConfig``.
+
+Usage::
+
+    with FakeAPIServer(FakeAPIConfig(latency=0.05, throttle_rate=0.01)) as server:
+        client = OpenMeteoClient(base_url=server.url + "/v1/archive")
+"""
+
+import json
+import random
+import threading
+import time
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlsplit
+
+import numpy as np
+import pandas as pd
+
+from enstoe_client import THRESHOLD
+
+DATA_DIR = Path(__file__).parent / "data"
+ENTSOE_DATETIME_FORMAT = "%Y%m%d%H%M"
+
+
+@dataclass
+class FakeAPIConfig:
+    latency: float = 0.0  # mean added latency, seconds
+    latency_jitter: float = 0.0  # uniform jitter around the mean, seconds
+    error_rate: float = 0.0  # probability of a 500
+    throttle_rate: float = 0.0  # probability of a random 429
+    max_rps: float | None = None  # quota above which requests get a 429
+    retry_after: float = 1.0  # Retry-After sent with 429s, seconds
+    extra_payload_bytes: int = 0  # padding appended to every response body
+    recorded_dir: str | Path | None = None  # recorded RTE payloads to replay
+    seed: int | None = None
+
+
+def _load_profiles() -> dict[str, np.ndarray]:
+    """96 quarter-hour values of one day for each consumption type."""
+    with open(DATA_DIR / "france_consumption.json", "r") as f:
+        previsions = json.load(f)
+    return {
+        p["type"]: np.array([v["value"] for v in p["values"]], dtype=float)
+        for p in previsions
+    }
+
+
+def _load_recorded(directory: Path) -> dict:
+    """Recorded short-term consumptions (by type) and power exchanges."""
+    with open(directory / "consumptions.json", "r") as f:
+        short_term = json.load(f)["short_term"]
+    with open(directory / "power_exchanges.json", "r") as f:
+        power_exchanges = json.load(f)
+    return {
+        "short_term": {p["type"]: p for p in short_term},
+        "france_power_exchanges": power_exchanges,
+    }
+
+
+class FakeAPIServer:
+    def __init__(self, config: FakeAPIConfig | None = None, port: int = 0) -> None:
+        self.config = config or FakeAPIConfig()
+        self.profiles = _load_profiles()
+        with open(DATA_DIR / "france_power_exchanges.json", "r") as f:
+            self.power_exchanges = json.load(f)
+        self.recorded = (
+            _load_recorded(Path(self.config.recorded_dir))
+            if self.config.recorded_dir is not None
+            else None
+        )
+
+        self._random = random.Random(self.config.seed)
+        self._lock = threading.Lock()
+        self._window_start = time.monotonic()
+        self._window_count = 0
+        self.requests_count = 0
+        self.status_counts: dict[int, int] = {}
+
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                server._handle(self, "GET")
+
+            def do_POST(self):
+                server._handle(self, "POST")
+
+            def log_message(self, format, *args):
+                pass
+
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+        self._httpd.daemon_threads = True
+        self._thread: threading.Thread | None = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "FakeAPIServer":
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self) -> "FakeAPIServer":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    # ---------- request handling ----------
+    def _over_quota(self) -> bool:
+        if self.config.max_rps is None:
+            return False
+        with self._lock:
+            now = time.monotonic()
+            if now - self._window_start >= 1.0:
+                self._window_start, self._window_count = now, 0
+            self._window_count += 1
+            return self._window_count > self.config.max_rps
+
+    def _handle(self, handler: BaseHTTPRequestHandler, method: str) -> None:
+        cfg = self.config
+        with self._lock:
+            self.requests_count += 1
+            draw = self._random.random()
+            jitter = self._random.uniform(-1, 1) * cfg.latency_jitter
+        if cfg.latency or jitter:
+            time.sleep(max(0.0, cfg.latency + jitter))
+
+        # drain the request body to keep the connection reusable
+        length = int(handler.headers.get("Content-Length") or 0)
+        if length:
+            handler.rfile.read(length)
+
+        url = urlsplit(handler.path)
+        params = {k: v[0] for k, v in parse_qs(url.query).items()}
+        headers = {}
+        if self._over_quota() or draw < cfg.throttle_rate:
+            status, content_type, body = 429, "text/plain", "Too Many Requests"
+            headers["Retry-After"] = str(cfg.retry_after)
+        elif draw < cfg.throttle_rate + cfg.error_rate:
+            status, content_type, body = 500, "text/plain", "Internal Server Error"
+        else:
+            try:
+                status, content_type, body = self._route(method, url.path, params)
+            except (KeyError, ValueError) as e:
+                status, content_type, body = 400, "text/plain", f"Bad request: {e}"
+
+        payload = body.encode() + b" " * cfg.extra_payload_bytes
+        with self._lock:
+            self.status_counts[status] = self.status_counts.get(status, 0) + 1
+        handler.send_response(status)
+        handler.send_header("Content-Type", content_type)
+        handler.send_header("Content-Length", str(len(payload)))
+        for key, value in headers.items():
+            handler.send_header(key, value)
+        handler.end_headers()
+        handler.wfile.write(payload)
+
+    def _route(self, method: str, path: str, params: dict[str, str]):
+        path = path.rstrip("/")
+        if method == "POST" and path.endswith("token/oauth"):
+            body = {"access_token": "fake-token", "expires_in": 7200}
+            return 200, "application/json", json.dumps(body)
+        if path.endswith("/api"):
+            return 200, "text/xml", self._entsoe_load(params)
+        if path.endswith("short_term"):
+            return 200, "application/json", self._rte_consumption(params)
+        if path.endswith("france_power_exchanges"):
+            if self.recorded is not None:
+                body = self.recorded["france_power_exchanges"]
+            else:
+                body = self.power_exchanges
+            return 200, "application/json", json.dumps(body)
+        if path.endswith("/v1/archive"):
+            return 200, "application/json", self._open_meteo(params)
+        return 404, "text/plain", "Not Found"
+
+    # ---------- payloads ----------
+    def _quarter_values(self, index: pd.DatetimeIndex, kind: str) -> np.ndarray:
+        """Consumption profile value of each quarter-hour of `index`."""
+        local = index.tz_convert("CET")
+        return self.profiles[kind][local.hour * 4 + local.minute // 15]
+
+    def _entsoe_load(self, params: dict[str, str]) -> str:
+        start = pd.to_datetime(params["periodStart"], format=ENTSOE_DATETIME_FORMAT)
+        end = pd.to_datetime(params["periodEnd"], format=ENTSOE_DATETIME_FORMAT)
+        start, end = start.tz_localize("UTC"), end.tz_localize("UTC")
+
+        periods = []
+        for p_start, p_end, resolution in (
+            (start, min(end, THRESHOLD), "PT60M"),
+            (max(start, THRESHOLD), end, "PT15M"),
+        ):
+            if p_start >= p_end:
+                continue
+            freq = "1h" if resolution == "PT60M" else "15min"
+            index = pd.date_range(p_start, p_end, freq=freq, inclusive="left")
+            values = self._quarter_values(index, "REALISED")
+            points = "".join(
+                f"<Point><position>{i + 1}</position>"
+                f"<quantity>{int(v)}</quantity></Point>"
+                for i, v in enumerate(values)
+            )
+            periods.append(
+                "<TimeSeries><mRID>1</mRID><businessType>A04</businessType>"
+                "<objectAggregation>A01</objectAggregation>"
+                f'<outBiddingZone_Domain.mRID codingScheme="A01">'
+                f"{params.get('outBiddingZone_Domain', '')}"
+                "</outBiddingZone_Domain.mRID>"
+                "<quantity_Measure_Unit.name>MAW</quantity_Measure_Unit.name>"
+                "<curveType>A01</curveType><Period><timeInterval>"
+                f"<start>{p_start:%Y-%m-%dT%H:%MZ}</start>"
+                f"<end>{p_end:%Y-%m-%dT%H:%MZ}</end></timeInterval>"
+                f"<resolution>{resolution}</resolution>{points}"
+                "</Period></TimeSeries>"
+            )
+
+        return (
+            '<?xml version="1.0" encoding="UTF-8"?>'
+            '<GL_MarketDocument xmlns="urn:iec62325.351:tc57wg16:451-6:'
+            'generationloaddocument:3:0"><mRID>fake</mRID>'
+            "<revisionNumber>1</revisionNumber><type>A65</type>"
+            "<process.processType>A16</process.processType>"
+            "<time_Period.timeInterval>"
+            f"<start>{start:%Y-%m-%dT%H:%MZ}</start>"
+            f"<end>{end:%Y-%m-%dT%H:%MZ}</end>"
+            f"</time_Period.timeInterval>{''.join(periods)}</GL_MarketDocument>"
+        )
+
+    def _rte_consumption(self, params: dict[str, str]) -> str:
+        if self.recorded is not None:
+            recorded = self.recorded["short_term"]
+            types = params.get("type", ",".join(recorded)).split(",")
+            short_term = [recorded[kind] for kind in types if kind in recorded]
+            return json.dumps({"short_term": short_term})
+
+        start = pd.Timestamp(params["start_date"]).tz_convert("CET")
+        end = pd.Timestamp(params["end_date"]).tz_convert("CET")
+        types = params.get("type", ",".join(self.profiles)).split(",")
+
+        index = pd.date_range(start, end, freq="15min", inclusive="left")
+        updated = pd.Timestamp.now(tz="CET").floor("s").isoformat()
+        short_term = []
+        for kind in types:
+            values = self._quarter_values(index, kind)
+            short_term.append(
+                {
+                    "type": kind,
+                    "start_date": start.isoformat(),
+                    "end_date": end.isoformat(),
+                    "values": [
+                        {
+                            "start_date": t.isoformat(),
+                            "end_date": (t + pd.Timedelta("15min")).isoformat(),
+                            "updated_date": updated,
+                            "value": int(v),
+                        }
+                        for t, v in zip(index, values)
+                    ],
+                }
+            )
+        return json.dumps({"short_term": short_term})
+
+    def _open_meteo(self, params: dict[str, str]) -> str:
+        lat = float(params["latitude"])
+        start = pd.Timestamp(params["start_date"], tz="UTC")
+        end = pd.Timestamp(params["end_date"], tz="UTC") + pd.Timedelta("1D")
+        index = pd.date_range(start, end, freq="1h", inclusive="left")
+
+        # seasonal and daily cycles, colder in the north
+        day = 2 * np.pi * index.dayofyear / 365.25
+        hour = 2 * np.pi * (index.hour - 15) / 24
+        temp = 12 - 8 * np.cos(day) + 4 * np.cos(hour) - 0.5 * (lat - 45)
+
+        body = {
+            "latitude": lat,
+            "longitude": float(params["longitude"]),
+            "hourly": {
+                "time": [f"{t:%Y-%m-%dT%H:%M}" for t in index],
+                "temperature_2m": np.round(temp, 1).tolist(),
+            },
+        }
+        return json.dumps(body)
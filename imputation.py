@@ -0,0 +1,177 @@
+"""
+Gap detection and imputation for assembled datasets.
+
+Missing values come from `format_ts` reindexing, DST edges and API outages.
+Gaps are found for all columns at once by run-length encoding the NaN mask,
+then each missing point is filled according to the length of its gap:
+
+- short gaps (``<= max_linear_gap`` points) are interpolated linearly,
+- longer gaps take the value of the same local hour one week earlier, or
+  of the closest earlier week with a value (up to ``seasonal_weeks``), so
+  gaps longer than a week are filled from the data before them,
+- what is left (all these weeks missing too, gaps at the edges) falls back
+  to linear interpolation, then to the nearest valid value.
+
+Everything is vectorized over the whole history.
+"""
+
+import numpy as np
+import pandas as pd
+
+from profiler import profiled
+
+MAX_LINEAR_GAP = 3
+SEASON = pd.Timedelta(days=7)
+SEASONAL_WEEKS = 4
+
+
+def _runs(mask: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Run-length encode the True runs of a 2-D (time x columns) mask.
+
+    Returns
+    -------
+    tuple of np.ndarray
+        Column, first position and length of every run, sorted by column
+        then position.
+    """
+    padded = np.zeros((mask.shape[1], mask.shape[0] + 2), dtype=np.int8)
+    padded[:, 1:-1] = mask.T
+    edges = np.diff(padded, axis=1)
+    # row-major order: starts and ends of a column alternate, so they pair up
+    cols, starts = np.nonzero(edges == 1)
+    _, ends = np.nonzero(edges == -1)
+    return cols, starts, ends - starts
+
+
+def _run_points(
+    cols: np.ndarray, starts: np.ndarray, lengths: np.ndarray
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Row, column and run number of every point of every run."""
+    run_ids = np.repeat(np.arange(len(starts)), lengths)
+    offsets = np.arange(lengths.sum()) - (np.cumsum(lengths) - lengths)[run_ids]
+    return starts[run_ids] + offsets, cols[run_ids], run_ids
+
+
+def gap_lengths(mask: np.ndarray) -> np.ndarray:
+    """Length of the gap each missing point belongs to (0 where present)."""
+    cols, starts, lengths = _runs(mask)
+    rows, point_cols, run_ids = _run_points(cols, starts, lengths)
+    out = np.zeros(mask.shape, dtype=np.int64)
+    out[rows, point_cols] = lengths[run_ids]
+    return out
+
+
+def find_gaps(df: pd.DataFrame, columns: list[str] | None = None) -> pd.DataFrame:
+    """
+    List the gaps of `columns` (all columns by default).
+
+    Returns
+    -------
+    pd.DataFrame
+        One row per gap with columns 'column', 'start', 'end' (last missing
+        timestamp) and 'length' (number of missing points).
+    """
+    columns = list(df.columns) if columns is None else columns
+    cols, starts, lengths = _runs(df[columns].isna().to_numpy())
+    return pd.DataFrame(
+        {
+            "column": np.asarray(columns, dtype=object)[cols],
+            "start": df.index[starts],
+            "end": df.index[starts + lengths - 1],
+            "length": lengths,
+        }
+    )
+
+
+def _same_hour_weeks_before(df: pd.DataFrame, weeks: int = 1) -> pd.DataFrame:
+    """Values at the same local hour `weeks` weeks earlier, aligned on df.index."""
+    index = df.index
+    if index.tz is None:
+        previous = index - weeks * SEASON
+    else:
+        previous = (index.tz_localize(None) - weeks * SEASON).tz_localize(
+            index.tz, ambiguous="NaT", nonexistent="NaT"
+        )
+    values = df.reindex(previous).to_numpy()
+    return pd.DataFrame(values, index=index, columns=df.columns)
+
+
+def _seasonal(df: pd.DataFrame, weeks: int) -> np.ndarray:
+    """Value of the closest of the `weeks` previous weeks having one."""
+    seasonal = np.full(df.shape, np.nan)
+    for k in range(1, weeks + 1):
+        seasonal = np.where(
+            np.isnan(seasonal), _same_hour_weeks_before(df, k).to_numpy(), seasonal
+        )
+    return seasonal
+
+
+@profiled("impute")
+def impute(
+    df: pd.DataFrame,
+    columns: list[str] | None = None,
+    max_linear_gap: int = MAX_LINEAR_GAP,
+    freq: str | None = "1h",
+    seasonal_weeks: int = SEASONAL_WEEKS,
+) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Fill the gaps of `columns` (numeric columns with missing values by default).
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        Dataset with a DatetimeIndex.
+    columns : list[str], optional
+        Columns to impute.
+    max_linear_gap : int
+        Longest gap (in points) filled by linear interpolation.
+    freq : str | None
+        If set, the index is first made regular at this frequency so that
+        missing rows become missing values.
+    seasonal_weeks : int
+        Number of previous weeks searched for the value of a long gap.
+
+    Returns
+    -------
+    tuple[pd.DataFrame, pd.DataFrame]
+        The imputed dataset and the gaps found (see `find_gaps`) with a
+        'method' column: 'linear', 'seasonal' or 'fallback' when part of the
+        gap could not be filled by its policy.
+    """
+    if freq is not None:
+        df = df.asfreq(freq)
+    if columns is None:
+        numeric = df.select_dtypes("number")
+        columns = list(numeric.columns[numeric.isna().any()])
+
+    gaps = find_gaps(df, columns)
+    if gaps.empty:
+        return df, gaps.assign(method=pd.Series(dtype=object))
+
+    data = df[columns]
+    values = data.to_numpy(dtype=float)
+    missing = np.isnan(values)
+    lengths = gap_lengths(missing)
+
+    linear = data.interpolate(method="linear", limit_area="inside").to_numpy()
+    seasonal = _seasonal(data, seasonal_weeks)
+    nearest = data.ffill().bfill().to_numpy()
+
+    by_policy = np.where(lengths <= max_linear_gap, linear, seasonal)
+    filled = np.where(missing, by_policy, values)
+    filled = np.where(np.isnan(filled), linear, filled)
+    filled = np.where(np.isnan(filled), nearest, filled)
+
+    # a gap is reported as 'fallback' if any of its points missed its policy
+    fallback = missing & np.isnan(by_policy)
+    rows, point_cols, run_ids = _run_points(*_runs(missing))
+    gap_fallback = np.zeros(len(gaps), dtype=bool)
+    np.logical_or.at(gap_fallback, run_ids, fallback[rows, point_cols])
+
+    method = np.where(gaps["length"] <= max_linear_gap, "linear", "seasonal")
+    gaps["method"] = np.where(gap_fallback, "fallback", method)
+
+    df = df.copy()
+    df[columns] = filled
+    return df, gaps
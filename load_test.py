@@ -0,0 +1,189 @@
+"""
+Load test driver for the API clients and `build_dataset`, run against the
+local `fake_api_server` (the real APIs are never called).
+
+For every target and concurrency setting, the driver fires a fixed number of
+calls from a thread pool, with the shared rate limiter capped at the same
+concurrency, and reports throughput and p50/p95/p99 latency::
+
+    python load_test.py --targets entsoe open_meteo build_dataset \\
+        --concurrency 1 2 4 8 --calls 40 --latency 0.05 --throttle-rate 0.02
+
+The ENTSO-E target only needs entsoe-py, the other ones import ``config``
+(RTE credentials, cities).
+"""
+
+import argparse
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable
+
+import numpy as np
+import pandas as pd
+from entsoe import entsoe as entsoe_api
+
+from enstoe_client import EntsoeHourlyClient
+from fake_api_server import FakeAPIConfig, FakeAPIServer
+from rate_limiter import HostQuota, set_quota
+
+TARGETS = ("entsoe", "rte", "open_meteo", "build_dataset")
+FIRST_DAY = pd.Timestamp("2024-01-01", tz="CET")
+
+
+def _window(i: int, days: int) -> tuple[pd.Timestamp, pd.Timestamp]:
+    """A different window for every call, so nothing can be cached."""
+    start = FIRST_DAY + pd.Timedelta(days=i * days)
+    return start, start + pd.Timedelta(days=days)
+
+
+def make_task(target: str, base_url: str, days: int) -> Callable[[int], object]:
+    """Callable running the i-th call of `target` against the fake server."""
+    if target == "entsoe":
+        client = EntsoeHourlyClient(api_key="FAKE")
+        return lambda i: client.get_hourly_load(*_window(i, days))
+
+    if target == "rte":
+        from rte_client import RTEClient
+
+        client = RTEClient(api_base=base_url, use_cache_file=False)
+        return lambda i: client.get_realised_consumption(*_window(i, days))
+
+    if target == "open_meteo":
+        from open_meteo_client import OpenMeteoClient
+
+        client = OpenMeteoClient(base_url=base_url + "/v1/archive")
+        return lambda i: client.get_averaged(*_window(i, days))
+
+    if target == "build_dataset":
+        from builder import build_dataset
+        from open_meteo_client import OpenMeteoClient
+
+        entsoe = EntsoeHourlyClient(api_key="FAKE")
+        meteo = OpenMeteoClient(base_url=base_url + "/v1/archive")
+        return lambda i: build_dataset(*_window(i, days), entsoe, meteo)
+
+    raise ValueError(f"Unknown target: {target}")
+
+
+def run_scenario(
+    task: Callable[[int], object], calls: int, concurrency: int
+) -> dict[str, float]:
+    def timed(i: int) -> tuple[float, bool]:
+        t0 = time.perf_counter()
+        try:
+            task(i)
+            ok = True
+        except Exception:
+            ok = False
+        return time.perf_counter() - t0, ok
+
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        results = list(executor.map(timed, range(calls)))
+    elapsed = time.perf_counter() - t0
+
+    latencies = np.array([r[0] for r in results])
+    p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+    return {
+        "calls": calls,
+        "errors": sum(not r[1] for r in results),
+        "seconds": elapsed,
+        "throughput": calls / elapsed,
+        "p50": p50,
+        "p95": p95,
+        "p99": p99,
+    }
+
+
+def run(
+    targets: list[str],
+    concurrencies: list[int],
+    calls: int,
+    days: int,
+    server_config: FakeAPIConfig,
+    client_rate: float,
+) -> list[dict]:
+    rows = []
+    with FakeAPIServer(server_config) as server:
+        entsoe_api.URL = server.url + "/api"
+        for target in targets:
+            for concurrency in concurrencies:
+                # fresh clients: nothing cached by a previous scenario
+                task = make_task(target, server.url, days)
+                # fixed limit: the adaptive controller must not blur the setting
+                set_quota(
+                    server.url,
+                    HostQuota(
+                        rate=client_rate,
+                        burst=max(1, int(client_rate)),
+                        max_concurrency=concurrency,
+                        initial_concurrency=concurrency,
+                    ),
+                )
+                stats = run_scenario(task, calls, concurrency)
+                rows.append({"target": target, "concurrency": concurrency, **stats})
+        rows_status = dict(sorted(server.status_counts.items()))
+    print("server responses by status:", rows_status)
+    return rows
+
+
+def report(rows: list[dict]) -> str:
+    lines = [
+        f"{'target':<15}{'conc':>5}{'calls':>7}{'errors':>7}{'calls/s':>9}"
+        f"{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}"
+    ]
+    for r in rows:
+        lines.append(
+            f"{r['target']:<15}{r['concurrency']:>5}{r['calls']:>7}{r['errors']:>7}"
+            f"{r['throughput']:>9.1f}{1000 * r['p50']:>9.1f}"
+            f"{1000 * r['p95']:>9.1f}{1000 * r['p99']:>9.1f}"
+        )
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--targets", nargs="+", choices=TARGETS, default=["entsoe"])
+    parser.add_argument("--concurrency", nargs="+", type=int, default=[1, 2, 4, 8])
+    parser.add_argument("--calls", type=int, default=40)
+    parser.add_argument("--days", type=int, default=7, help="Days fetched per call.")
+    parser.add_argument(
+        "--client-rate",
+        type=float,
+        default=1000.0,
+        help="Requests per second allowed by the client-side limiter.",
+    )
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--latency-jitter", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--throttle-rate", type=float, default=0.0)
+    parser.add_argument("--max-rps", type=float, default=None)
+    parser.add_argument("--retry-after", type=float, default=0.1)
+    parser.add_argument("--extra-payload-bytes", type=int, default=0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="Also write the results to this file.")
+    args = parser.parse_args()
+
+    server_config = FakeAPIConfig(
+        latency=args.latency,
+        latency_jitter=args.latency_jitter,
+        error_rate=args.error_rate,
+        throttle_rate=args.throttle_rate,
+        max_rps=args.max_rps,
+        retry_after=args.retry_after,
+        extra_payload_bytes=args.extra_payload_bytes,
+        seed=args.seed,
+    )
+    rows = run(
+        args.targets,
+        args.concurrency,
+        args.calls,
+        args.days,
+        server_config,
+        args.client_rate,
+    )
+    print(report(rows))
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(rows, f, indent=2)
@@ -1,10 +1,17 @@
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict
 
 import pandas as pd
 import requests
 
 from config import CITIES_CFG, OPEN_METEO_BASE_URL, TZ
+from profiler import stage
+from rate_limiter import get_limiter
 from utils import format_ts
+from weather_grid import PointCache, Weightings, aggregate
+
+# Concurrent requests when fetching many points, the limiter has the last word
+MAX_WORKERS = 4
 
 
 class OpenMeteoClient:
@@ -18,6 +25,7 @@ class OpenMeteoClient:
         cities_cfg: Dict[str, Dict[str, float]] = CITIES_CFG,
         base_url: str = OPEN_METEO_BASE_URL,
         timezone: str = TZ,
+        weightings: Weightings | None = None,
     ) -> None:
         """
         Parameters
@@ -29,10 +37,19 @@ class OpenMeteoClient:
                 "lyon": {"lat": 45.764, "lon": 4.8357, "weight": 0.10},
                 ...
             }
+        weightings : dict, optional
+            Named weightings of the cities, e.g.
+            {"population": {"paris": 0.18, ...}, "heating": {...}}.
+            "population" defaults to the "weight" of `cities_cfg`.
         """
         self.cities_cfg = cities_cfg
         self.timezone = timezone
         self.base_url = base_url
+        self.weightings = {
+            "population": {name: info["weight"] for name, info in cities_cfg.items()},
+            **(weightings or {}),
+        }
+        self.cache = PointCache()
 
     def get_city(
         self,
@@ -51,6 +68,26 @@ class OpenMeteoClient:
         start = start.tz_convert("UTC")
         end = end.tz_convert("UTC")
 
+        raw = self.cache.get(
+            (city_name, lat, lon),
+            start,
+            end,
+            lambda s, e: self._fetch(city_name, lat, lon, s, e),
+        )
+        ts = format_ts(raw, start=start, end=end, include_start=False)
+        if ts.index[-1] == end.floor("h"):
+            ts = ts[:-1]
+        return ts
+
+    def _fetch(
+        self,
+        city_name: str,
+        lat: float,
+        lon: float,
+        start: pd.Timestamp,
+        end: pd.Timestamp,
+    ) -> pd.Series:
+        """Raw hourly temperature (UTC) of the whole days of [start, end]."""
         url = (
             f"{self.base_url}?latitude={lat}&longitude={lon}"
             f"&start_date={start.strftime('%Y-%m-%d')}&end_date={end.strftime('%Y-%m-%d')}"
@@ -58,7 +95,11 @@ class OpenMeteoClient:
             f"&timezone=UTC"
         )
 
-        response = requests.get(url)
+        def send():
+            with stage("http.open_meteo"):
+                return requests.get(url)
+
+        response = get_limiter(url).call(send)
         response.raise_for_status()
         data = response.json()
         df = pd.DataFrame(
@@ -70,10 +111,33 @@ class OpenMeteoClient:
         df = df.set_index("datetime")
         # Returns in the desired timezone (from the url)
         df.index = df.index.tz_localize("UTC")
-        ts = format_ts(df.squeeze(), start=start, end=end, include_start=False)
-        if ts.index[-1] == end.floor("h"):
-            ts = ts[:-1]
-        return ts
+        return df[city_name]
+
+    def get_cities(
+        self, start: pd.Timestamp, end: pd.Timestamp, max_workers: int = MAX_WORKERS
+    ) -> pd.DataFrame:
+        """Hourly temperature of every configured city, one column per city."""
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {
+                name: executor.submit(
+                    self.get_city, name, info["lat"], info["lon"], start, end
+                )
+                for name, info in self.cities_cfg.items()
+            }
+            return pd.DataFrame({name: f.result() for name, f in futures.items()})
+
+    def get_weighted(
+        self,
+        start: pd.Timestamp,
+        end: pd.Timestamp,
+        weightings: Weightings | None = None,
+    ) -> pd.DataFrame:
+        """
+        Weighted average temperatures, one column per weighting (all the
+        client's weightings by default). Weights are renormalized at every
+        timestamp over the cities with data.
+        """
+        return aggregate(self.get_cities(start, end), weightings or self.weightings)
 
     def get_averaged(self, start: pd.Timestamp, end: pd.Timestamp) -> pd.Series:
         """
@@ -81,20 +145,16 @@ class OpenMeteoClient:
         and compute the population-weighted national average.
 
         NB: Although the population of a city in not fixed through time,
-        we take the current one, no matter start,end
+        we take the current one, no matter start,end. Missing cities are left
+        out and the weights of the others renormalized.
 
         Returns
         -------
-        pd.DataFrame
-            Columns: datetime, temp_<city>, temp_FR
+        pd.Series
+            National average temperature, named 'temp'.
         """
-        tss = []
-        for name, info in self.cities_cfg.items():
-            ts = info["weight"] * self.get_city(
-                name, info["lat"], info["lon"], start, end
-            )
-            tss.append(ts)
-        mean_ts = pd.concat(tss, axis=1).sum(axis=1, skipna=True)
+        population = {"population": self.weightings["population"]}
+        mean_ts = self.get_weighted(start, end, population)["population"]
 
         return mean_ts.rename("temp").round(2)
 
@@ -0,0 +1,231 @@
+"""
+Opt-in stage-level profiler for the dataset pipeline.
+
+Enable it either for the whole process with the environment variable
+``ECLIPSE_PROFILE`` (``1``, or ``cprofile`` to also collect cProfile stats;
+the report is printed to stderr at exit and written as JSON to
+``ECLIPSE_PROFILE_JSON`` if set), or around a block::
+
+    with profiling() as prof:
+        build_dataset(start, end)
+    print(prof.report())
+
+Pipeline code marks its stages with ``stage(name)`` or ``@profiled(name)``.
+For each stage, the profiler records the number of calls, the wall time,
+the peak traced memory (tracemalloc) and the net number of allocated memory
+blocks. When profiling is disabled, a stage costs one global lookup.
+
+Stages may run in worker threads (e.g. the HTTP calls of the clients' thread
+pools): each thread nests its own stages. Memory is measured for the whole
+process though: the peak of a stage includes what the other threads
+allocated while it ran.
+"""
+
+import atexit
+import cProfile
+import io
+import json
+import os
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+from dataclasses import asdict, dataclass
+from functools import wraps
+
+ENV_VAR = "ECLIPSE_PROFILE"
+JSON_ENV_VAR = "ECLIPSE_PROFILE_JSON"
+CPROFILE_TOP = 20
+
+_NULL_STAGE = nullcontext()
+
+
+@dataclass
+class StageStats:
+    calls: int = 0
+    seconds: float = 0.0
+    peak_bytes: int = 0
+    blocks: int = 0
+
+
+class _Frame:
+    __slots__ = ("name", "t0", "blocks0", "base", "peak")
+
+    def __init__(self, name: str, base: int) -> None:
+        self.name = name
+        self.t0 = time.perf_counter()
+        self.blocks0 = sys.getallocatedblocks()
+        self.base = base
+        self.peak = base
+
+
+class Profiler:
+    def __init__(self, cprofile: bool = False) -> None:
+        self.stats: dict[str, StageStats] = {}
+        self._local = threading.local()
+        # open stages of every thread, they all see the tracemalloc peak
+        self._open: set[_Frame] = set()
+        self._lock = threading.Lock()
+        self._cprofile = cProfile.Profile() if cprofile else None
+        self._started_tracemalloc = False
+
+    def start(self) -> None:
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracemalloc = True
+        if self._cprofile is not None:
+            self._cprofile.enable()
+
+    def stop(self) -> None:
+        if self._cprofile is not None:
+            self._cprofile.disable()
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+            self._started_tracemalloc = False
+
+    def _stack(self) -> list[_Frame]:
+        """Open stages of the calling thread, innermost last."""
+        if not hasattr(self._local, "stack"):
+            self._local.stack = []
+        return self._local.stack
+
+    @contextmanager
+    def stage(self, name: str):
+        stack = self._stack()
+        # The tracemalloc peak is process-wide: save the peak reached so far
+        # by the open stages (of all threads) before resetting it.
+        with self._lock:
+            current, peak = tracemalloc.get_traced_memory()
+            for frame in self._open:
+                frame.peak = max(frame.peak, peak)
+            tracemalloc.reset_peak()
+            frame = _Frame(name, current)
+            self._open.add(frame)
+        stack.append(frame)
+        try:
+            yield
+        finally:
+            stack.pop()
+            seconds = time.perf_counter() - frame.t0
+            with self._lock:
+                self._open.discard(frame)
+                frame.peak = max(frame.peak, tracemalloc.get_traced_memory()[1])
+                for parent in stack:
+                    parent.peak = max(parent.peak, frame.peak)
+
+                stats = self.stats.setdefault(name, StageStats())
+                stats.calls += 1
+                stats.seconds += seconds
+                stats.peak_bytes = max(stats.peak_bytes, frame.peak - frame.base)
+                stats.blocks += sys.getallocatedblocks() - frame.blocks0
+
+    def cprofile_stats(self) -> pstats.Stats | None:
+        if self._cprofile is None:
+            return None
+        return pstats.Stats(self._cprofile)
+
+    def to_dict(self) -> dict:
+        data = {"stages": {name: asdict(s) for name, s in self.stats.items()}}
+        stats = self.cprofile_stats()
+        if stats is not None:
+            top = sorted(stats.stats.items(), key=lambda kv: kv[1][3], reverse=True)
+            data["cprofile"] = [
+                {
+                    "function": f"{file}:{line}({func})",
+                    "calls": nc,
+                    "tottime": tt,
+                    "cumtime": ct,
+                }
+                for (file, line, func), (_, nc, tt, ct, _) in top[:CPROFILE_TOP]
+            ]
+        return data
+
+    def to_json(self, **kwargs) -> str:
+        return json.dumps(self.to_dict(), **kwargs)
+
+    def report(self) -> str:
+        """Compact table of the stages, slowest first."""
+        lines = [
+            f"{'stage':<28}{'calls':>7}{'total s':>10}{'mean ms':>10}"
+            f"{'peak MiB':>10}{'blocks':>10}"
+        ]
+        for name, s in sorted(
+            self.stats.items(), key=lambda kv: kv[1].seconds, reverse=True
+        ):
+            lines.append(
+                f"{name:<28}{s.calls:>7}{s.seconds:>10.3f}"
+                f"{1000 * s.seconds / s.calls:>10.2f}"
+                f"{s.peak_bytes / 2**20:>10.1f}{s.blocks:>10}"
+            )
+        stats = self.cprofile_stats()
+        if stats is not None:
+            out = io.StringIO()
+            stats.stream = out
+            stats.sort_stats("cumulative").print_stats(CPROFILE_TOP)
+            lines.append(out.getvalue())
+        return "\n".join(lines)
+
+
+_active: Profiler | None = None
+
+
+def stage(name: str):
+    """Context manager timing a pipeline stage (no-op when disabled)."""
+    if _active is None:
+        return _NULL_STAGE
+    return _active.stage(name)
+
+
+def profiled(name: str | None = None):
+    """Decorator version of `stage`, named after the function by default."""
+
+    def decorator(func):
+        stage_name = name or func.__name__
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if _active is None:
+                return func(*args, **kwargs)
+            with _active.stage(stage_name):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+@contextmanager
+def profiling(cprofile: bool = False):
+    """Profile the pipeline stages run inside the block."""
+    global _active
+    previous = _active
+    prof = Profiler(cprofile=cprofile)
+    _active = prof
+    prof.start()
+    try:
+        yield prof
+    finally:
+        prof.stop()
+        _active = previous
+
+
+def _profile_process(mode: str) -> None:
+    global _active
+    prof = Profiler(cprofile=mode == "cprofile")
+    _active = prof
+    prof.start()
+
+    def dump() -> None:
+        prof.stop()
+        print(prof.report(), file=sys.stderr)
+        if os.environ.get(JSON_ENV_VAR):
+            with open(os.environ[JSON_ENV_VAR], "w") as f:
+                f.write(prof.to_json(indent=2))
+
+    atexit.register(dump)
+
+
+if os.environ.get(ENV_VAR, "") not in ("", "0"):
+    _profile_process(os.environ[ENV_VAR])
@@ -0,0 +1,319 @@
+"""
+Per-host rate limiting shared by the ENTSO-E, RTE and Open-Meteo clients.
+
+Each upstream host gets one ``HostLimiter`` made of:
+- a token bucket enforcing the request quota of the host,
+- an AIMD concurrency controller: the number of requests in flight grows by
+  one per window of successful, fast responses and is halved on 429/503
+  responses, connection errors or latency spikes.
+
+Requests sent through ``HostLimiter.call`` are retried when throttled, after
+the Retry-After delay, so a 429 slows a backfill down instead of failing it.
+
+Limiters are process-wide and work from threads as well as from asyncio
+coroutines, so parallel backfills converge to the highest throughput the
+quotas allow without manual tuning.
+"""
+
+import asyncio
+import threading
+import time
+from collections import deque
+from contextlib import asynccontextmanager, contextmanager
+from dataclasses import dataclass
+from typing import Callable
+from urllib.parse import urlsplit
+
+import requests
+
+THROTTLE_STATUS_CODES = (429, 503)
+# Time to wait after a throttled response without a Retry-After header
+DEFAULT_BACKOFF = 1.0
+# Retries of a throttled request by `HostLimiter.call`
+MAX_THROTTLE_RETRIES = 3
+# Poll period of coroutines waiting for a concurrency slot
+ASYNC_POLL_INTERVAL = 0.01
+
+
+@dataclass(frozen=True)
+class HostQuota:
+    rate: float  # requests per second
+    burst: int  # bucket capacity
+    max_concurrency: int
+    initial_concurrency: int = 2
+
+
+# RTE data portal: quotas per application, keep it gentle. Also used by
+# RTEClient for whatever host `config.RTE_BASE_URL` points to.
+RTE_QUOTA = HostQuota(rate=2.0, burst=4, max_concurrency=4)
+
+HOST_QUOTAS = {
+    # 400 requests per minute and per token
+    "web-api.tp.entsoe.eu": HostQuota(rate=400 / 60, burst=10, max_concurrency=8),
+    "digital.iservices.rte-france.com": RTE_QUOTA,
+    # Open-Meteo free tier: 600 calls per minute
+    "archive-api.open-meteo.com": HostQuota(rate=10.0, burst=10, max_concurrency=8),
+}
+DEFAULT_QUOTA = HostQuota(rate=5.0, burst=5, max_concurrency=4)
+
+
+class TokenBucket:
+    """Thread-safe token bucket. Waiting happens outside of the lock."""
+
+    def __init__(self, rate: float, capacity: float) -> None:
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated_at = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def _reserve(self) -> float:
+        """Take one token and return how long the caller must wait for it."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(
+                self.capacity, self._tokens + (now - self._updated_at) * self.rate
+            )
+            self._updated_at = now
+            self._tokens -= 1
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+            return max(wait, self._paused_until - now)
+
+    def pause(self, seconds: float) -> None:
+        """Stop handing out tokens for `seconds` (e.g. after a Retry-After)."""
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+    def acquire(self) -> None:
+        wait = self._reserve()
+        if wait > 0:
+            time.sleep(wait)
+
+    async def acquire_async(self) -> None:
+        wait = self._reserve()
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+
+class AdaptiveConcurrency:
+    """
+    AIMD controller of the number of requests in flight.
+
+    The limit increases by ``1 / limit`` per successful response (about +1 per
+    window of ``limit`` responses) and is multiplied by ``decrease_factor`` on
+    throttling or when the latency exceeds ``latency_tolerance`` times the
+    baseline: the ``baseline_quantile`` of the last ``latency_window``
+    latencies. Requests of very different sizes (a one-day query next to a
+    multi-month one) then raise the baseline instead of being taken for
+    congestion, and old latencies age out.
+
+    Decreases, on throttling as on latency, happen at most once per window of
+    ``limit`` responses, and responses to the requests already in flight at
+    the last decrease are ignored: one burst of 429s or of slow responses
+    halves the limit once, not once per response.
+    """
+
+    def __init__(
+        self,
+        initial: int,
+        maximum: int,
+        minimum: int = 1,
+        decrease_factor: float = 0.5,
+        latency_tolerance: float = 3.0,
+        latency_window: int = 50,
+        baseline_quantile: float = 0.9,
+        min_samples: int = 5,
+    ) -> None:
+        self.minimum = minimum
+        self.maximum = maximum
+        self.decrease_factor = decrease_factor
+        self.latency_tolerance = latency_tolerance
+        self.baseline_quantile = baseline_quantile
+        self.min_samples = min_samples
+        self.limit = float(min(max(initial, minimum), maximum))
+        self.in_flight = 0
+        self.latencies: deque[float] = deque(maxlen=latency_window)
+        self._since_decrease = float("inf")
+        # requests sent before the last decrease and not released yet
+        self._sent_before_decrease = 0
+        self._cond = threading.Condition()
+
+    @property
+    def baseline(self) -> float | None:
+        """Latency quantile of the recent responses, None until enough samples."""
+        if len(self.latencies) < self.min_samples:
+            return None
+        ordered = sorted(self.latencies)
+        return ordered[int(self.baseline_quantile * (len(ordered) - 1))]
+
+    def _try_acquire(self) -> bool:
+        with self._cond:
+            if self.in_flight < int(self.limit):
+                self.in_flight += 1
+                return True
+            return False
+
+    def acquire(self) -> None:
+        with self._cond:
+            while self.in_flight >= int(self.limit):
+                self._cond.wait()
+            self.in_flight += 1
+
+    async def acquire_async(self) -> None:
+        while not self._try_acquire():
+            await asyncio.sleep(ASYNC_POLL_INTERVAL)
+
+    def release(self, latency: float | None = None, throttled: bool = False) -> None:
+        with self._cond:
+            self.in_flight -= 1
+            self._since_decrease += 1
+            sent_before = self._sent_before_decrease > 0
+            if sent_before:
+                self._sent_before_decrease -= 1
+            if throttled:
+                self._decrease(sent_before)
+            elif latency is not None:
+                baseline = self.baseline
+                self.latencies.append(latency)
+                if baseline is not None and (
+                    latency > self.latency_tolerance * baseline
+                ):
+                    self._decrease(sent_before)
+                else:
+                    self.limit = min(self.maximum, self.limit + 1 / self.limit)
+            self._cond.notify_all()
+
+    def _decrease(self, sent_before: bool) -> None:
+        if sent_before or self._since_decrease < self.limit:
+            return
+        self.limit = max(self.minimum, self.limit * self.decrease_factor)
+        self._since_decrease = 0
+        self._sent_before_decrease = self.in_flight
+
+
+class Permit:
+    """Handed out by ``HostLimiter.throttle``, collects the response status."""
+
+    def __init__(self) -> None:
+        self.status_code: int | None = None
+        self.retry_after: float | None = None
+
+    def observe(self, response: requests.Response) -> None:
+        self.status_code = response.status_code
+        retry_after = response.headers.get("Retry-After")
+        if retry_after is not None:
+            try:
+                self.retry_after = float(retry_after)
+            except ValueError:
+                pass
+
+
+class HostLimiter:
+    def __init__(self, quota: HostQuota) -> None:
+        self.quota = quota
+        self.bucket = TokenBucket(quota.rate, quota.burst)
+        self.concurrency = AdaptiveConcurrency(
+            quota.initial_concurrency, quota.max_concurrency
+        )
+
+    def _release(self, permit: Permit, started_at: float, error: BaseException | None):
+        if isinstance(error, requests.HTTPError) and error.response is not None:
+            permit.observe(error.response)
+
+        throttled = permit.status_code in THROTTLE_STATUS_CODES or isinstance(
+            error, (requests.ConnectionError, requests.Timeout)
+        )
+        if throttled:
+            self.bucket.pause(
+                DEFAULT_BACKOFF if permit.retry_after is None else permit.retry_after
+            )
+
+        # Other errors (bad parameters, no data...) say nothing about the load
+        # of the host, and neither does the latency of a failed request.
+        latency = time.monotonic() - started_at if error is None else None
+        self.concurrency.release(latency=latency, throttled=throttled)
+
+    @contextmanager
+    def throttle(self):
+        """
+        Wait for a request slot. Call ``permit.observe(response)`` in the block
+        so that the status code drives the concurrency limit; HTTPError raised
+        by ``raise_for_status`` in the block are observed automatically.
+        """
+        self.concurrency.acquire()
+        self.bucket.acquire()
+        permit = Permit()
+        started_at = time.monotonic()
+        try:
+            yield permit
+        except BaseException as e:
+            self._release(permit, started_at, e)
+            raise
+        self._release(permit, started_at, None)
+
+    def call(
+        self,
+        send: Callable[[], requests.Response],
+        max_retries: int = MAX_THROTTLE_RETRIES,
+    ) -> requests.Response:
+        """
+        Run ``send()`` under ``throttle`` and retry it, up to `max_retries`
+        times, while the host answers 429/503 (returned, or raised as
+        HTTPError by ``raise_for_status`` in `send`). Each retry waits for the
+        Retry-After pause of the bucket. The last response is returned, or
+        its HTTPError raised, when the retries are exhausted.
+        """
+        for attempt in range(max_retries + 1):
+            last = attempt == max_retries
+            try:
+                with self.throttle() as permit:
+                    response = send()
+                    permit.observe(response)
+            except requests.HTTPError as e:
+                status = e.response.status_code if e.response is not None else None
+                if last or status not in THROTTLE_STATUS_CODES:
+                    raise
+                continue
+            if last or response.status_code not in THROTTLE_STATUS_CODES:
+                return response
+
+    @asynccontextmanager
+    async def athrottle(self):
+        """Asyncio counterpart of ``throttle``, sharing the same budget."""
+        await self.concurrency.acquire_async()
+        await self.bucket.acquire_async()
+        permit = Permit()
+        started_at = time.monotonic()
+        try:
+            yield permit
+        except BaseException as e:
+            self._release(permit, started_at, e)
+            raise
+        self._release(permit, started_at, None)
+
+
+_limiters: dict[str, HostLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def get_limiter(url: str, default: HostQuota = DEFAULT_QUOTA) -> HostLimiter:
+    """
+    Return the limiter shared by every request sent to the host of `url`.
+    Hosts missing from HOST_QUOTAS get the `default` quota.
+    """
+    parts = urlsplit(url)
+    key = parts.netloc or url
+    with _limiters_lock:
+        if key not in _limiters:
+            quota = HOST_QUOTAS.get(parts.hostname, default)
+            _limiters[key] = HostLimiter(quota)
+        return _limiters[key]
+
+
+def set_quota(url: str, quota: HostQuota) -> HostLimiter:
+    """Replace the limiter of the host of `url` (e.g. for load tests)."""
+    limiter = HostLimiter(quota)
+    with _limiters_lock:
+        _limiters[urlsplit(url).netloc or url] = limiter
+    return limiter
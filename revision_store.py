@@ -0,0 +1,255 @@
+"""
+Append-only, revision-aware store for RTE data.
+
+RTE republishes recent periods (intraday realised consumption, power
+exchanges) with a new 'updated_date'. Instead of keeping only the last value,
+the store keeps every version keyed by (series, start_date, updated_date):
+
+- "latest" gives the current best values,
+- "as of T" gives the values that were known at time T, which makes
+  backtests reproducible without re-downloading anything,
+- refreshes only fetch the periods that can still be revised.
+
+On disk, each append writes one new parquet segment holding only the
+versions that were not stored yet; `compact` merges the segments. In memory
+the versions are kept sorted by (series, start_date, updated_date): an
+append only sorts the stored rows between its first and last start dates
+(the recent periods, for a refresh), and queries are binary searches on the
+series and the dates followed by one vectorized pass.
+"""
+
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+import numpy as np
+import pandas as pd
+
+if TYPE_CHECKING:
+    from config import PrevisionType
+    from rte_client import RTEClient
+
+KEY = ["series", "start_date", "updated_date"]
+# Periods older than this are considered final by RTE
+REVISION_HORIZON = pd.Timedelta(days=3)
+SEGMENT_GLOB = "segment-*.parquet"
+
+
+class RevisionStore:
+    def __init__(self, root: str | Path | None = None) -> None:
+        """
+        Parameters
+        ----------
+        root : str | Path | None
+            Directory of the parquet segments. In memory only if None.
+        """
+        self.root = Path(root) if root is not None else None
+        segments = sorted(self.root.glob(SEGMENT_GLOB)) if self.root else []
+        frames = [pd.read_parquet(p) for p in segments]
+        self._versions = self._sort(pd.concat(frames) if frames else self._empty())
+
+    @staticmethod
+    def _empty() -> pd.DataFrame:
+        return pd.DataFrame(
+            {
+                "series": pd.Series(dtype=str),
+                "start_date": pd.Series(dtype="datetime64[ns, UTC]"),
+                "updated_date": pd.Series(dtype="datetime64[ns, UTC]"),
+                "value": pd.Series(dtype=float),
+            }
+        )
+
+    @staticmethod
+    def _sort(df: pd.DataFrame) -> pd.DataFrame:
+        df = df.drop_duplicates(subset=KEY, keep="last")
+        return df.sort_values(KEY, ignore_index=True)
+
+    def _series_bounds(self, series: str) -> tuple[int, int]:
+        names = self._versions["series"].to_numpy()
+        return (
+            int(np.searchsorted(names, series, "left")),
+            int(np.searchsorted(names, series, "right")),
+        )
+
+    def _series_slice(self, series: str) -> pd.DataFrame:
+        lo, hi = self._series_bounds(series)
+        return self._versions.iloc[lo:hi]
+
+    # ---------- writes ----------
+    def append(
+        self, series: str, revisions: pd.DataFrame, column: str = "value"
+    ) -> int:
+        """
+        Store the versions of `revisions` (columns 'start_date', 'updated_date'
+        and `column`, as returned by `_rte_revisions`) that are not known yet.
+
+        Returns
+        -------
+        int
+            Number of new versions.
+        """
+        new = pd.DataFrame(
+            {
+                "series": series,
+                "start_date": revisions["start_date"].dt.tz_convert("UTC"),
+                "updated_date": revisions["updated_date"].dt.tz_convert("UTC"),
+                "value": revisions[column].astype(float),
+            }
+        )
+        new = new.drop_duplicates(subset=KEY, keep="last")
+        if new.empty:
+            return 0
+
+        # stored rows of the series between the first and last new start dates
+        lo, hi = self._series_bounds(series)
+        dates = self._versions["start_date"].iloc[lo:hi]
+        first = lo + int(dates.searchsorted(new["start_date"].min(), "left"))
+        last = lo + int(dates.searchsorted(new["start_date"].max(), "right"))
+        middle = self._versions.iloc[first:last]
+
+        known = middle.set_index(KEY[1:]).index
+        new = new[~new.set_index(KEY[1:]).index.isin(known)]
+        if new.empty:
+            return 0
+
+        if self.root is not None:
+            self.root.mkdir(parents=True, exist_ok=True)
+            self._write_segment(new)
+
+        middle = pd.concat([middle, new]).sort_values(KEY[1:])
+        self._versions = pd.concat(
+            [self._versions.iloc[:first], middle, self._versions.iloc[last:]],
+            ignore_index=True,
+        )
+        return len(new)
+
+    def _write_segment(self, df: pd.DataFrame) -> Path:
+        """Write `df` atomically as the segment following the existing ones."""
+        segments = sorted(self.root.glob(SEGMENT_GLOB))
+        n = int(segments[-1].stem.removeprefix("segment-")) + 1 if segments else 0
+        path = self.root / f"segment-{n:06d}.parquet"
+        tmp = path.with_suffix(".tmp")
+        df.to_parquet(tmp, index=False)
+        tmp.replace(path)
+        return path
+
+    def compact(self) -> None:
+        """
+        Merge all the segments into one file. The merged segment is written
+        before the old ones are deleted: after a crash in between, the
+        duplicated versions are dropped on load.
+        """
+        if self.root is None:
+            return
+        segments = sorted(self.root.glob(SEGMENT_GLOB))
+        if len(segments) < 2:
+            return
+        self._write_segment(self._versions)
+        for path in segments:
+            path.unlink()
+
+    # ---------- reads ----------
+    def series(self) -> list[str]:
+        return sorted(self._versions["series"].unique())
+
+    def revisions(self, series: str) -> pd.DataFrame:
+        """Every stored version of `series`, sorted by start and update date."""
+        return self._series_slice(series).drop(columns="series").reset_index(drop=True)
+
+    def as_of(
+        self,
+        series: str,
+        when: pd.Timestamp | None = None,
+        start: pd.Timestamp | None = None,
+        end: pd.Timestamp | None = None,
+    ) -> pd.Series:
+        """
+        Values of `series` on [start, end) as they were known at `when`
+        (the latest versions if None).
+        """
+        df = self._series_slice(series)
+        dates = df["start_date"]
+        lo = 0 if start is None else dates.searchsorted(start, "left")
+        hi = len(df) if end is None else dates.searchsorted(end, "left")
+        df = df.iloc[lo:hi]
+        if when is not None:
+            df = df[df["updated_date"] <= when]
+        # rows are sorted by (start_date, updated_date): the last row of each
+        # start_date is the most recent version
+        df = df.drop_duplicates(subset="start_date", keep="last")
+        return pd.Series(
+            df["value"].to_numpy(),
+            index=pd.DatetimeIndex(df["start_date"], name=None),
+            name=series,
+        )
+
+    def latest(
+        self,
+        series: str,
+        start: pd.Timestamp | None = None,
+        end: pd.Timestamp | None = None,
+    ) -> pd.Series:
+        return self.as_of(series, None, start, end)
+
+    def refresh_start(
+        self,
+        series: str,
+        now: pd.Timestamp,
+        horizon: pd.Timedelta = REVISION_HORIZON,
+    ) -> pd.Timestamp | None:
+        """
+        First period that has to be fetched again to be up to date: the end
+        of the stored data, or the beginning of the revision horizon if
+        earlier. None if nothing is stored for `series`.
+        """
+        df = self._series_slice(series)
+        if df.empty:
+            return None
+        return min(df["start_date"].iloc[-1], now - horizon)
+
+
+def refresh_consumption(
+    store: RevisionStore,
+    client: "RTEClient",
+    prevision_type: "PrevisionType | None" = None,
+    start: pd.Timestamp | None = None,
+    now: pd.Timestamp | None = None,
+    horizon: pd.Timedelta = REVISION_HORIZON,
+) -> int:
+    """
+    Fetch the short-term consumption periods that may have been revised since
+    the last refresh and append the new versions.
+
+    `prevision_type` defaults to REALISED. `start` is only used when nothing
+    is stored yet.
+
+    Returns
+    -------
+    int
+        Number of new versions stored.
+    """
+    from config import PrevisionType
+
+    prevision_type = prevision_type or PrevisionType.REALISED
+    now = now or pd.Timestamp.now(tz="UTC")
+    series = f"consumption/{prevision_type.value}"
+    start = store.refresh_start(series, now, horizon) or start
+    if start is None:
+        raise ValueError(f"Nothing stored for {series}, `start` is required.")
+
+    revisions = client.get_short_term_consumption_revisions(
+        types=prevision_type, start=start, end=now
+    )
+    if prevision_type not in revisions:
+        return 0
+    return store.append(series, revisions[prevision_type])
+
+
+def refresh_power_exchanges(store: RevisionStore, client: "RTEClient") -> int:
+    """
+    Append the new versions of the France power exchange volumes and prices
+    (the endpoint only serves the recent days).
+    """
+    revisions = client.get_france_power_exchange_revisions()
+    return store.append("power_exchanges/value", revisions, "value") + store.append(
+        "power_exchanges/price", revisions, "price"
+    )
@@ -0,0 +1,318 @@
+"""
+Multi-resolution storage of timeseries with pre-aggregated rollups.
+
+For every series the store keeps the native points (15 min for RTE and recent
+ENTSO-E data) plus materialized hourly, daily and monthly rollups holding
+sum/count/min/max. These statistics compose, so:
+
+- appending data only recomputes the buckets touched by the new points,
+  each level being built from the level just below it,
+- a query at any resolution is answered from the coarsest level whose
+  buckets fit in the requested ones, e.g. weekly means come from the daily
+  rollup instead of a rescan of the native points.
+
+Daily and monthly buckets follow the local calendar of ``tz``.
+
+On disk every level is partitioned by local month (by year for the monthly
+rollup), so an append only rewrites the partitions it touched.
+"""
+
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from pandas.tseries.frequencies import to_offset
+from pandas.tseries.offsets import (
+    Day,
+    MonthBegin,
+    QuarterBegin,
+    Tick,
+    Week,
+    YearBegin,
+)
+
+ROLLUP_LEVELS = ("hourly", "daily", "monthly")
+STATS = ("sum", "count", "min", "max")
+AGGREGATIONS = ("mean", *STATS)
+# How the statistics of a level combine into a coarser bucket
+_COMBINE = {"sum": "sum", "count": "sum", "min": "min", "max": "max"}
+
+
+def _bucket(index: pd.DatetimeIndex, level: str, tz: str) -> pd.DatetimeIndex:
+    """Start of the `level` bucket of each timestamp."""
+    if level == "hourly":
+        # floor in UTC: local hours are ambiguous on DST days
+        return index.tz_convert("UTC").floor("h").tz_convert(tz)
+    local = index.tz_convert(tz)
+    if level == "daily":
+        return local.normalize()
+    naive = local.tz_localize(None).to_period("M").to_timestamp()
+    return naive.tz_localize(tz)
+
+
+def _point_stats(ts: pd.Series) -> pd.DataFrame:
+    """Native points seen as one-point buckets."""
+    values = ts.to_numpy()
+    return pd.DataFrame(
+        {"sum": values, "count": 1.0, "min": values, "max": values}, index=ts.index
+    )
+
+
+def _next_bucket(bucket: pd.Timestamp, level: str) -> pd.Timestamp:
+    """Start of the bucket following `bucket` (in local calendar time)."""
+    if level == "hourly":
+        return bucket + pd.Timedelta("1h")
+    step = pd.DateOffset(days=1) if level == "daily" else pd.DateOffset(months=1)
+    return (bucket.tz_localize(None) + step).tz_localize(bucket.tz)
+
+
+def _partition_keys(index: pd.DatetimeIndex, level: str, tz: str) -> pd.Index:
+    """Name of the on-disk partition of each timestamp of `level`."""
+    return pd.Index(
+        index.tz_convert(tz).strftime("%Y" if level == "monthly" else "%Y-%m")
+    )
+
+
+def _splice(existing: pd.DataFrame, new: pd.DataFrame, merge: bool) -> pd.DataFrame:
+    """
+    Insert the sorted `new` rows into the sorted `existing` ones without
+    re-sorting everything: only the rows between the first and last new
+    timestamps are touched. With `merge`, existing rows of that range are
+    kept unless overwritten, otherwise the whole range is replaced.
+    """
+    lo = existing.index.searchsorted(new.index[0], side="left")
+    hi = existing.index.searchsorted(new.index[-1], side="right")
+    middle = new
+    if merge and hi > lo:
+        middle = pd.concat([existing.iloc[lo:hi], new])
+        middle = middle[~middle.index.duplicated(keep="last")].sort_index()
+    return pd.concat([existing.iloc[:lo], middle, existing.iloc[hi:]])
+
+
+def _level_for(freq: str) -> str | None:
+    """
+    Coarsest rollup whose buckets fit in buckets of `freq`, None for raw.
+
+    Calendar frequencies ("D", "W", "MS"...) follow the local days of the
+    daily rollup. Fixed durations ("24h", "48h"...) are not local days (these
+    last 23 or 25 hours on DST changes) and are built from the hourly rollup.
+    """
+    offset = to_offset(freq)
+    if isinstance(offset, (MonthBegin, QuarterBegin, YearBegin)):
+        return "monthly"
+    if isinstance(offset, (Day, Week)):
+        return "daily"
+    if isinstance(offset, Tick):
+        if offset.nanos % pd.Timedelta("1h").value == 0:
+            return "hourly"
+        return None
+    raise ValueError(f"Unsupported query frequency: {freq}")
+
+
+class RollupStore:
+    def __init__(self, root: str | Path | None = None, tz: str = "CET") -> None:
+        """
+        Parameters
+        ----------
+        root : str | Path | None
+            Directory where series are persisted as parquet files
+            (``<root>/<series>/<level>/<partition>.parquet``). In memory
+            only if None.
+        tz : str
+            Timezone of the daily and monthly calendars.
+        """
+        self.root = Path(root) if root is not None else None
+        self.tz = tz
+        self._raw: dict[str, pd.Series] = {}
+        self._rollups: dict[str, dict[str, pd.DataFrame]] = {}
+
+    # ---------- persistence ----------
+    def _dir(self, name: str, level: str) -> Path:
+        return self.root / name / level
+
+    def _read_level(self, name: str, level: str) -> pd.DataFrame | None:
+        paths = sorted(self._dir(name, level).glob("*.parquet"))
+        return pd.concat([pd.read_parquet(p) for p in paths]) if paths else None
+
+    def _load(self, name: str) -> None:
+        if name in self._raw:
+            return
+        raw = self._read_level(name, "raw") if self.root is not None else None
+        if raw is not None:
+            self._raw[name] = raw["value"]
+            self._rollups[name] = {
+                level: self._read_level(name, level) for level in ROLLUP_LEVELS
+            }
+        else:
+            self._raw[name] = pd.Series(
+                dtype=float, index=pd.DatetimeIndex([], tz="UTC"), name="value"
+            )
+            self._rollups[name] = {
+                level: pd.DataFrame(
+                    columns=list(STATS),
+                    index=pd.DatetimeIndex([], tz=self.tz),
+                    dtype=float,
+                )
+                for level in ROLLUP_LEVELS
+            }
+
+    def _save(self, name: str, touched: dict[str, pd.DatetimeIndex]) -> None:
+        """Rewrite the partitions of each level holding `touched` timestamps."""
+        if self.root is None:
+            return
+        frames = {"raw": self._raw[name].to_frame(), **self._rollups[name]}
+        for level, df in frames.items():
+            directory = self._dir(name, level)
+            directory.mkdir(parents=True, exist_ok=True)
+            keys = _partition_keys(df.index, level, self.tz)
+            for key in _partition_keys(touched[level], level, self.tz).unique():
+                lo, hi = keys.searchsorted(key, "left"), keys.searchsorted(key, "right")
+                path = directory / f"{key}.parquet"
+                tmp = path.with_suffix(".tmp")
+                df.iloc[lo:hi].to_parquet(tmp)
+                tmp.replace(path)
+
+    # ---------- writes ----------
+    def append(self, name: str, ts: pd.Series) -> None:
+        """
+        Add (or overwrite) native points of series `name` and update the
+        rollup buckets they fall in.
+        """
+        if not isinstance(ts.index, pd.DatetimeIndex) or ts.index.tz is None:
+            raise ValueError("`ts` must have a timezone-aware DatetimeIndex.")
+        ts = ts.dropna()
+        if ts.empty:
+            return
+        self._load(name)
+
+        new = ts.astype(float).rename("value")
+        new.index = new.index.tz_convert("UTC")
+        new = new[~new.index.duplicated(keep="last")].sort_index()
+        raw = _splice(self._raw[name].to_frame(), new.to_frame(), merge=True)
+        self._raw[name] = raw["value"]
+
+        # each level is rebuilt from the level below, on the contiguous range
+        # of buckets touched by the new points only
+        source = self._raw[name]
+        changed = new.index
+        touched = {"raw": changed}
+        for level in ROLLUP_LEVELS:
+            buckets = _bucket(changed, level, self.tz)
+            first, last = buckets.min(), buckets.max()
+            lo = source.index.searchsorted(first, side="left")
+            hi = source.index.searchsorted(_next_bucket(last, level), side="left")
+            part = source.iloc[lo:hi]
+            if isinstance(part, pd.Series):
+                part = _point_stats(part)
+            updated = part.groupby(_bucket(part.index, level, self.tz)).agg(_COMBINE)
+
+            rollup = _splice(self._rollups[name][level], updated, merge=False)
+            self._rollups[name][level] = rollup
+
+            source = rollup
+            changed = updated.index
+            touched[level] = changed
+
+        self._save(name, touched)
+
+    # ---------- reads ----------
+    def series(self) -> list[str]:
+        names = set(self._raw)
+        if self.root is not None and self.root.exists():
+            names |= {p.parent.name for p in self.root.glob("*/raw")}
+        return sorted(names)
+
+    def raw(self, name: str) -> pd.Series:
+        self._load(name)
+        return self._raw[name].tz_convert(self.tz)
+
+    def rollup(self, name: str, level: str) -> pd.DataFrame:
+        """Materialized rollup with columns sum/count/min/max and mean."""
+        self._load(name)
+        df = self._rollups[name][level]
+        return df.assign(mean=df["sum"] / df["count"])
+
+    def query(
+        self,
+        name: str,
+        freq: str,
+        start: pd.Timestamp | None = None,
+        end: pd.Timestamp | None = None,
+        agg: str | list[str] = "mean",
+    ) -> pd.Series | pd.DataFrame:
+        """
+        Aggregates of series `name` over buckets of `freq` in [start, end),
+        read from the nearest pre-aggregated level. Only the points in
+        [start, end) are aggregated: when a bound falls inside a bucket of
+        that level, the partial bucket is computed from the native points.
+
+        Parameters
+        ----------
+        freq : str
+            Pandas frequency, e.g. "15min", "1h", "6h", "1D", "W", "MS".
+        agg : str | list[str]
+            One or several of "mean", "sum", "count", "min", "max".
+        """
+        aggs = [agg] if isinstance(agg, str) else list(agg)
+        unknown = set(aggs) - set(AGGREGATIONS)
+        if unknown:
+            raise ValueError(f"Unknown aggregation(s): {sorted(unknown)}")
+
+        self._load(name)
+        source = self._source(name, _level_for(freq), start, end)
+        df = source.resample(freq).agg(_COMBINE)
+        df = df[df["count"] > 0]
+        df["mean"] = df["sum"] / df["count"]
+        df = df[aggs]
+        return df[agg] if isinstance(agg, str) else df
+
+    def _source(
+        self,
+        name: str,
+        level: str | None,
+        start: pd.Timestamp | None,
+        end: pd.Timestamp | None,
+    ) -> pd.DataFrame:
+        """
+        Statistics covering exactly [start, end): whole buckets of `level`,
+        plus native points for the partial buckets at the bounds.
+        """
+        raw = self._raw[name].tz_convert(self.tz)
+
+        def points(lo, hi):
+            mask = np.ones(len(raw), dtype=bool)
+            if lo is not None:
+                mask &= raw.index >= lo
+            if hi is not None:
+                mask &= raw.index < hi
+            return _point_stats(raw[mask])
+
+        if level is None:
+            return points(start, end)
+
+        # whole buckets of the level inside [start, end)
+        inner_start, inner_end = start, end
+        if start is not None:
+            first = _bucket(pd.DatetimeIndex([start]), level, self.tz)[0]
+            inner_start = first if first == start else _next_bucket(first, level)
+        if end is not None:
+            inner_end = _bucket(pd.DatetimeIndex([end]), level, self.tz)[0]
+        if (
+            inner_start is not None
+            and inner_end is not None
+            and inner_start >= inner_end
+        ):
+            return points(start, end)
+
+        rollup = self._rollups[name][level]
+        mask = np.ones(len(rollup), dtype=bool)
+        if inner_start is not None:
+            mask &= rollup.index >= inner_start
+        if inner_end is not None:
+            mask &= rollup.index < inner_end
+        parts = [rollup[mask]]
+        if start is not None and inner_start != start:
+            parts.insert(0, points(start, inner_start))
+        if end is not None and inner_end != end:
+            parts.append(points(inner_end, end))
+        return pd.concat(parts) if len(parts) > 1 else parts[0]
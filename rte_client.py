@@ -14,10 +14,13 @@ import requests
 
 import config
 from config import APIService, PrevisionType
+from profiler import profiled, stage
+from rate_limiter import RTE_QUOTA, get_limiter
 
 FREQ = "15min"
 
 
+@profiled()
 def _rte_data_cleaning(
     values: dict[str, Any],
     *,
@@ -50,6 +53,33 @@ def _rte_data_cleaning(
     return df_with_freq
 
 
+@profiled()
+def _rte_revisions(
+    values: list[dict[str, Any]],
+    *,
+    columns: list[str] = ["value"],
+    updated_date: str | None = None,
+) -> pd.DataFrame:
+    """
+    Unlike `_rte_data_cleaning`, keeps every published version of the values.
+
+    Returns a DataFrame with UTC 'start_date' and 'updated_date' columns and
+    the value columns, one row per (start_date, updated_date). `updated_date`
+    is used for values that do not carry their own (power exchanges are
+    published per day).
+    """
+    df = pd.DataFrame(values, columns=["start_date", "updated_date", *columns])
+    if updated_date is not None:
+        df["updated_date"] = df["updated_date"].fillna(updated_date)
+    for col in ("start_date", "updated_date"):
+        df[col] = pd.to_datetime(df[col], errors="coerce", utc=True)
+    for col in columns:
+        df[col] = pd.to_numeric(df[col], errors="coerce")
+    df = df.dropna(subset=["start_date", "updated_date"])
+    df = df.drop_duplicates(subset=["start_date", "updated_date"], keep="last")
+    return df.sort_values(["start_date", "updated_date"], ignore_index=True)
+
+
 class TokenManager:
     def __init__(
         self,
@@ -101,8 +131,15 @@ class TokenManager:
             "Authorization": self._basic_auth_header(),
             "Content-Type": "application/x-www-form-urlencoded",
         }
+
+        def send():
+            with stage("http.rte"):
+                return requests.post(
+                    self.token_url, headers=headers, timeout=self.timeout
+                )
+
         try:
-            resp = requests.post(self.token_url, headers=headers, timeout=self.timeout)
+            resp = get_limiter(self.token_url, RTE_QUOTA).call(send)
         except requests.RequestException as e:
             raise RTEAuthError(f"Network error while fetching token: {e}")
 
@@ -155,7 +192,7 @@ class RTEClient:
         for service in api_services:
             client_id, client_secret = config.API_TO_CREDENTIALS[service]
             self.services[service] = {
-                "url": api_base + config.API_TO_ENDPOINT[service].rstrip("/"),
+                "url": self.api_base + config.API_TO_ENDPOINT[service].rstrip("/"),
                 "token_manager": TokenManager(
                     client_id,
                     client_secret,
@@ -190,15 +227,21 @@ class RTEClient:
             req_headers.update(headers)
 
         method = method.upper()
+        limiter = get_limiter(url, RTE_QUOTA)
+
+        def send():
+            with stage("http.rte"):
+                return requests.request(
+                    method,
+                    url,
+                    headers=req_headers,
+                    params=params,
+                    data=data,
+                    timeout=self.timeout,
+                )
+
         try:
-            resp = requests.request(
-                method,
-                url,
-                headers=req_headers,
-                params=params,
-                data=data,
-                timeout=self.timeout,
-            )
+            resp = limiter.call(send)
         except requests.RequestException as e:
             raise RuntimeError(f"Erreur lors de l'appel API: {e}")
 
@@ -215,22 +258,18 @@ class RTEClient:
             token = cfg["token_manager"]._access_token
             if token:
                 req_headers["Authorization"] = f"Bearer {token}"
-                resp = requests.request(
-                    method,
-                    url,
-                    headers=req_headers,
-                    params=params,
-                    data=data,
-                    timeout=self.timeout,
-                )
+                resp = limiter.call(send)
 
         return resp
 
     # ---------- API methods ----------
-    def get_france_power_exchanges(self) -> pd.DataFrame:
+    def _get_france_power_exchanges_data(self) -> list[dict[str, Any]]:
         resp = self.request(APIService.wholesale_market, method="GET")
         resp.raise_for_status()
-        data = resp.json().get("france_power_exchanges", [])
+        return resp.json().get("france_power_exchanges", [])
+
+    def get_france_power_exchanges(self) -> pd.DataFrame:
+        data = self._get_france_power_exchanges_data()
         total_values = []
         for entry in data:
             values = entry.get("values", [])
@@ -241,16 +280,30 @@ class RTEClient:
         df = _rte_data_cleaning(total_values, columns=["value", "price"])
         return df
 
-    def get_short_term_consumptions(
-        self,
-        types: PrevisionType | list[PrevisionType] | None = None,
-        start: pd.Timestamp | None = None,
-        end: pd.Timestamp | None = None,
-    ) -> dict[PrevisionType, pd.Series]:
+    def get_france_power_exchange_revisions(self) -> pd.DataFrame:
         """
-        French realised load data (15Mmin)
-        RTE only sends data for the whole day so we have to cut ourself.
+        Same data as `get_france_power_exchanges` keeping the publication date
+        of each day (see `_rte_revisions`).
         """
+        frames = [
+            _rte_revisions(
+                entry["values"],
+                columns=["value", "price"],
+                updated_date=entry.get("updated_date"),
+            )
+            for entry in self._get_france_power_exchanges_data()
+            if entry.get("values")
+        ]
+        if not frames:
+            return _rte_revisions([], columns=["value", "price"])
+        return pd.concat(frames, ignore_index=True)
+
+    def _get_short_term_data(
+        self,
+        types: PrevisionType | list[PrevisionType] | None,
+        start: pd.Timestamp | None,
+        end: pd.Timestamp | None,
+    ) -> list[dict[str, Any]]:
         params = {}
         if types:
             if isinstance(types, list):
@@ -266,7 +319,19 @@ class RTEClient:
 
         resp = self.request(APIService.consumption, method="GET", params=params)
         resp.raise_for_status()
-        data = resp.json().get("short_term", [])
+        return resp.json().get("short_term", [])
+
+    def get_short_term_consumptions(
+        self,
+        types: PrevisionType | list[PrevisionType] | None = None,
+        start: pd.Timestamp | None = None,
+        end: pd.Timestamp | None = None,
+    ) -> dict[PrevisionType, pd.Series]:
+        """
+        French realised load data (15Mmin)
+        RTE only sends data for the whole day so we have to cut ourself.
+        """
+        data = self._get_short_term_data(types, start, end)
         if not data:
             return {}
 
@@ -286,6 +351,25 @@ class RTEClient:
 
         return previsions
 
+    def get_short_term_consumption_revisions(
+        self,
+        types: PrevisionType | list[PrevisionType] | None = None,
+        start: pd.Timestamp | None = None,
+        end: pd.Timestamp | None = None,
+    ) -> dict[PrevisionType, pd.DataFrame]:
+        """
+        Same data as `get_short_term_consumptions` keeping the 'updated_date'
+        of each value (see `_rte_revisions`). Whole days are returned.
+        """
+        previsions = {}
+        for prevision in self._get_short_term_data(types, start, end):
+            values = prevision.get("values", [])
+            if values:
+                previsions[PrevisionType(prevision.get("type"))] = _rte_revisions(
+                    values
+                )
+        return previsions
+
     def get_realised_consumption(
         self, start: pd.Timestamp, end: pd.Timestamp
     ) -> pd.Series:
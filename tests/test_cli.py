@@ -0,0 +1,94 @@
+import subprocess
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+import builder
+import cli
+from dataset_store import Manifest, write_partition
+
+ROOT = Path(__file__).parents[1]
+HEAVY_MODULES = ["config", "entsoe", "requests", "enstoe_client", "open_meteo_client"]
+
+
+def _dataset(root: Path, days: int = 14) -> pd.DataFrame:
+    index = pd.date_range("2025-01-01", periods=24 * days, freq="1h", tz="CET")
+    df = pd.DataFrame(
+        {"load": np.arange(len(index), dtype=float), "temp": 10.0}, index=index
+    )
+    manifest = Manifest(root)
+    manifest.chunk_freq = "7D"
+    for window_start in pd.date_range(index[0], periods=days // 7, freq="7D"):
+        part = df[
+            (df.index >= window_start) & (df.index < window_start + pd.Timedelta("7D"))
+        ]
+        manifest.record(
+            "dataset",
+            window_start,
+            window_start + pd.Timedelta("7D"),
+            write_partition(root, window_start, part),
+        )
+    return df
+
+
+def test_imports_are_lazy():
+    code = (
+        "import sys, cli, builder; "
+        f"print([m for m in {HEAVY_MODULES!r} if m in sys.modules])"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True
+    )
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip() == "[]"
+
+
+def test_load(tmp_path, capsys):
+    df = _dataset(tmp_path)
+    out = tmp_path / "out.csv"
+
+    assert (
+        cli.main(["load", str(tmp_path), "--start", "2025-01-03", "--csv", str(out)])
+        == 0
+    )
+
+    loaded = pd.read_csv(out, index_col=0)
+    expected = df[df.index >= pd.Timestamp("2025-01-03", tz="CET")]
+    np.testing.assert_array_equal(loaded["load"], expected["load"])
+
+
+def test_seasonal_naive():
+    index = pd.date_range("2025-01-01", periods=48, freq="1h", tz="CET")
+    history = pd.Series(np.arange(48.0), index=index)
+
+    forecast = cli.seasonal_naive(history, horizon=30, season="1D")
+
+    assert forecast.index[0] == index[-1] + pd.Timedelta("1h")
+    np.testing.assert_array_equal(forecast.iloc[:24], history.iloc[24:])
+    np.testing.assert_array_equal(forecast.iloc[24:], history.iloc[24:30])
+
+
+def test_update_resumes_from_first_window(tmp_path, monkeypatch):
+    _dataset(tmp_path)
+    calls = []
+    monkeypatch.setattr(
+        builder,
+        "build_dataset_chunked",
+        lambda start, end, path, **kwargs: calls.append((start, end, kwargs)) or [],
+    )
+
+    assert cli.main(["update", str(tmp_path), "--end", "2025-02-01"]) == 0
+
+    start, end, kwargs = calls[0]
+    assert (start, end) == (
+        pd.Timestamp("2025-01-01", tz="CET"),
+        pd.Timestamp("2025-02-01", tz="CET"),
+    )
+    # the windows of the original build
+    assert kwargs["chunk_freq"] == "7D"
+
+    # another layout would refetch (and replace) the whole history
+    assert cli.main(["update", str(tmp_path), "--chunk-freq", "MS"]) == 1
+    assert len(calls) == 1
@@ -0,0 +1,193 @@
+import pandas as pd
+import pytest
+from pandas.testing import assert_frame_equal
+
+from dataset_store import (
+    Manifest,
+    partition_path,
+    read_dataset,
+    time_windows,
+    write_partition,
+)
+
+
+@pytest.fixture
+def dataset():
+    idx = pd.date_range(
+        "2024-12-30", "2025-03-02", freq="h", tz="CET", inclusive="left"
+    )
+    return pd.DataFrame(
+        {"load": range(len(idx)), "is_weekend": (idx.dayofweek >= 5).astype(int)},
+        index=idx,
+    ).astype({"load": float})
+
+
+def test_time_windows_are_aligned_and_contiguous():
+    start = pd.Timestamp("2024-12-30", tz="CET")
+    end = pd.Timestamp("2025-03-02", tz="CET")
+
+    windows = time_windows(start, end)
+
+    assert [w[0] for w in windows] == [
+        start,
+        pd.Timestamp("2025-01-01", tz="CET"),
+        pd.Timestamp("2025-02-01", tz="CET"),
+        pd.Timestamp("2025-03-01", tz="CET"),
+    ]
+    assert windows[-1][1] == end
+    assert all(a[1] == b[0] for a, b in zip(windows[:-1], windows[1:]))
+
+
+def test_time_windows_raises_if_naive():
+    with pytest.raises(ValueError, match="timezone-aware"):
+        time_windows(pd.Timestamp("2025-01-01"), pd.Timestamp("2025-02-01"))
+
+
+def test_chunked_roundtrip_is_identical(tmp_path, dataset):
+    """Writing window by window and reading back gives the original frame."""
+    start, end = dataset.index[0], dataset.index[-1] + pd.Timedelta("1h")
+    for window_start, window_end in time_windows(start, end):
+        chunk = dataset[(dataset.index >= window_start) & (dataset.index < window_end)]
+        write_partition(tmp_path, window_start, chunk)
+
+    result = read_dataset(tmp_path)
+
+    assert_frame_equal(result, dataset, check_freq=False)
+    assert partition_path(tmp_path, start).exists()
+
+
+def test_read_dataset_sub_range(tmp_path, dataset):
+    start, end = dataset.index[0], dataset.index[-1] + pd.Timedelta("1h")
+    for window_start, window_end in time_windows(start, end):
+        chunk = dataset[(dataset.index >= window_start) & (dataset.index < window_end)]
+        write_partition(tmp_path, window_start, chunk)
+
+    sub_start = pd.Timestamp("2025-01-15", tz="CET")
+    sub_end = pd.Timestamp("2025-02-03", tz="CET")
+    result = read_dataset(tmp_path, sub_start, sub_end)
+
+    expected = dataset[(dataset.index >= sub_start) & (dataset.index < sub_end)]
+    assert_frame_equal(result, expected, check_freq=False)
+
+
+def test_read_dataset_raises_if_empty(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        read_dataset(tmp_path)
+
+
+def test_manifest_records_and_verifies_chunks(tmp_path, dataset):
+    window_start, window_end = dataset.index[0], dataset.index[-1]
+    manifest = Manifest(tmp_path)
+    assert not manifest.is_complete("load", window_start, window_end)
+
+    path = write_partition(tmp_path, window_start, dataset[["load"]], source="load")
+    manifest.record("load", window_start, window_end, path)
+
+    # state survives a restart
+    manifest = Manifest(tmp_path)
+    assert manifest.is_complete("load", window_start, window_end, verify=True)
+    assert not manifest.is_complete("temp", window_start, window_end)
+
+    # a corrupted chunk is only detected when checksums are verified
+    path.write_bytes(b"corrupted")
+    assert manifest.is_complete("load", window_start, window_end)
+    assert not manifest.is_complete("load", window_start, window_end, verify=True)
+
+    path.unlink()
+    assert not manifest.is_complete("load", window_start, window_end)
+
+
+def test_source_chunks_are_not_read_as_dataset(tmp_path, dataset):
+    window_start = dataset.index[0]
+    write_partition(tmp_path, window_start, dataset, source="load")
+
+    with pytest.raises(FileNotFoundError):
+        read_dataset(tmp_path)
+
+
+def test_partial_window_is_refetched(tmp_path):
+    start = pd.Timestamp("2025-01-01", tz="CET")
+    partial_end = start + pd.Timedelta("3D")
+    df = pd.DataFrame({"load": [1.0]}, index=[start])
+    manifest = Manifest(tmp_path)
+    path = write_partition(tmp_path, start, df, "load")
+    manifest.record("load", start, partial_end, path)
+
+    assert manifest.is_complete("load", start, partial_end)
+    assert not manifest.is_complete("load", start, start + pd.Timedelta("7D"))
+
+
+class StubEntsoe:
+    """Hourly load depending only on the timestamp, can fail once per window."""
+
+    def __init__(self, fail_at=()):
+        self.calls = []
+        self.fail_at = set(fail_at)
+
+    def get_hourly_load(self, start, end):
+        self.calls.append(start)
+        if start in self.fail_at:
+            self.fail_at.discard(start)
+            raise ConnectionError("ENTSO-E unavailable")
+        index = pd.date_range(
+            start.tz_convert("UTC").ceil("h"),
+            end.tz_convert("UTC"),
+            freq="1h",
+            inclusive="left",
+        )
+        return pd.DataFrame({"load": index.hour * 1000.0 + index.day}, index=index)
+
+
+class StubOpenMeteo:
+    def get_averaged(self, start, end):
+        index = pd.date_range(
+            start.tz_convert("UTC").ceil("h"),
+            end.tz_convert("UTC"),
+            freq="1h",
+            inclusive="left",
+        )
+        return pd.Series(index.dayofyear / 10, index=index, name="temp")
+
+
+def test_chunked_build_matches_in_memory_build(tmp_path):
+    from builder import build_dataset, build_dataset_chunked
+
+    start = pd.Timestamp("2024-01-01", tz="CET")
+    end = pd.Timestamp("2024-03-10", tz="CET")
+    feb = pd.Timestamp("2024-02-01", tz="CET")
+    expected = build_dataset(start, end, StubEntsoe(), StubOpenMeteo())
+
+    # first build from a later start, with February failing
+    late_start = pd.Timestamp("2024-01-15", tz="CET")
+    entsoe = StubEntsoe(fail_at=[feb])
+    with pytest.raises(RuntimeError, match="1 window"):
+        build_dataset_chunked(
+            late_start,
+            end,
+            tmp_path,
+            entsoe_client=entsoe,
+            open_meteo_client=StubOpenMeteo(),
+        )
+    assert entsoe.calls == [late_start, feb, pd.Timestamp("2024-03-01", tz="CET")]
+
+    # rerun from `start`: the failed window is resumed, the other ones are
+    # read from disk, and the January window of the first layout is replaced
+    # instead of being kept next to the new one
+    entsoe.calls.clear()
+    paths = build_dataset_chunked(
+        start, end, tmp_path, entsoe_client=entsoe, open_meteo_client=StubOpenMeteo()
+    )
+
+    assert entsoe.calls == [start, feb]
+    assert len(paths) == 3
+    assert len(list(tmp_path.glob("year=*/part-*.parquet"))) == 3
+    assert_frame_equal(read_dataset(tmp_path), expected, check_freq=False)
+    assert Manifest(tmp_path).chunk_freq == "MS"
+
+
+def test_read_dataset_rejects_overlapping_partitions(tmp_path, dataset):
+    write_partition(tmp_path, dataset.index[0], dataset.iloc[:48])
+    write_partition(tmp_path, dataset.index[24], dataset.iloc[24:72])
+
+    with pytest.raises(ValueError, match="Duplicate timestamps"):
+        read_dataset(tmp_path)
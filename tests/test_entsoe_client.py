@@ -1,6 +1,8 @@
 import pandas as pd
 import pytest
 import vcr
+from entsoe import EntsoePandasClient
+from entsoe.exceptions import NoMatchingDataError
 from inline_snapshot import snapshot
 
 from enstoe_client import THRESHOLD, EntsoeHourlyClient
@@ -82,3 +84,120 @@ def test_over_threshold(client):
 2024-12-31 01:00:00+00:00  60431.0\
 """
     )
+
+
+def test_detect_resolution_single_query(client, monkeypatch):
+    """Mixed hourly / 15-min data is fetched once and averaged per hour."""
+    hourly = pd.date_range(THRESHOLD - pd.Timedelta("2h"), periods=2, freq="h")
+    quarters = pd.date_range(THRESHOLD, periods=8, freq="15min")
+    raw = pd.DataFrame(
+        {"Actual Load": [66176.0, 63815.0, 1, 2, 3, 4, 10, 20, 30, 40]},
+        index=hourly.append(quarters).tz_convert("Europe/Paris"),
+    )
+    calls = []
+
+    def fake_query_load(self, country_code, start, end):
+        calls.append((country_code, start, end))
+        return raw
+
+    monkeypatch.setattr(EntsoePandasClient, "query_load", fake_query_load)
+
+    start = THRESHOLD - pd.DateOffset(hours=2)
+    end = THRESHOLD + pd.DateOffset(hours=2)
+    ts = client.get_hourly_load(start=start, end=end, detect_resolution=True)
+
+    assert len(calls) == 1
+    assert str(ts) == snapshot(
+        """\
+                              load
+2024-12-30 22:00:00+00:00  66176.0
+2024-12-30 23:00:00+00:00  63815.0
+2024-12-31 00:00:00+00:00      2.5
+2024-12-31 01:00:00+00:00     25.0\
+"""
+    )
+
+    segments = client.resolutions["FR"]
+    assert segments["resolution"].tolist() == [
+        pd.Timedelta("1h"),
+        pd.Timedelta("15min"),
+    ]
+    assert segments["points"].tolist() == [2, 8]
+
+
+def test_detect_resolution_with_outage(client, monkeypatch):
+    """Hourly points next to a hole, or isolated, are kept as they are."""
+    index = pd.DatetimeIndex(
+        ["2024-06-01 00:00", "2024-06-01 01:00", "2024-06-01 04:00"], tz="UTC"
+    )
+    raw = pd.DataFrame({"Actual Load": [1.0, 2.0, 3.0]}, index=index)
+    monkeypatch.setattr(
+        EntsoePandasClient, "query_load", lambda self, code, start, end: raw
+    )
+
+    start = pd.Timestamp("2024-06-01 00:00", tz="UTC")
+    ts = client.get_hourly_load(
+        start, start + pd.Timedelta("5h"), detect_resolution=True
+    )
+
+    assert ts["load"].tolist()[:2] == [1.0, 2.0]
+    assert ts["load"].iloc[4] == 3.0
+    assert ts["load"].iloc[2:4].isna().all()
+
+
+def test_get_hourly_loads_multi_zone(client, monkeypatch):
+    """Each zone becomes one column on a shared hourly index."""
+    start = THRESHOLD
+    end = THRESHOLD + pd.DateOffset(hours=3)
+    raws = {
+        # 15-min zone
+        "FR": pd.DataFrame(
+            {"Actual Load": range(12)},
+            index=pd.date_range(start, periods=12, freq="15min"),
+        ),
+        # hourly zone with a missing hour
+        "CH": pd.DataFrame(
+            {"Actual Load": [7.0, 9.0]},
+            index=pd.DatetimeIndex([start, start + pd.Timedelta("2h")]),
+        ),
+    }
+
+    def fake_query_load(self, country_code, start, end):
+        return raws[country_code]
+
+    monkeypatch.setattr(EntsoePandasClient, "query_load", fake_query_load)
+
+    df = client.get_hourly_loads(["FR", "CH"], start=start, end=end)
+
+    assert str(df) == snapshot(
+        """\
+                            FR   CH
+2024-12-31 00:00:00+00:00  1.5  7.0
+2024-12-31 01:00:00+00:00  5.5  NaN
+2024-12-31 02:00:00+00:00  9.5  9.0\
+"""
+    )
+
+
+def test_get_hourly_loads_zone_without_data(client, monkeypatch):
+    """A zone without data is left NaN, each worker uses its own session."""
+    start = THRESHOLD
+    end = THRESHOLD + pd.DateOffset(hours=2)
+    sessions = []
+
+    def fake_query_load(self, country_code, start, end):
+        sessions.append(self.session)
+        if country_code == "CH":
+            raise NoMatchingDataError
+        return pd.DataFrame(
+            {"Actual Load": [1.0, 2.0]},
+            index=pd.date_range(start, periods=2, freq="1h"),
+        )
+
+    monkeypatch.setattr(EntsoePandasClient, "query_load", fake_query_load)
+
+    df = client.get_hourly_loads(["FR", "CH", "BE"], start=start, end=end)
+
+    assert df["FR"].tolist() == df["BE"].tolist() == [1.0, 2.0]
+    assert df["CH"].isna().all()
+    assert all(session is not client.session for session in sessions)
@@ -0,0 +1,75 @@
+import pandas as pd
+import pytest
+import requests
+from entsoe import entsoe as entsoe_api
+
+from enstoe_client import THRESHOLD, EntsoeHourlyClient
+from fake_api_server import FakeAPIConfig, FakeAPIServer
+from load_test import run_scenario
+
+
+@pytest.fixture
+def server():
+    with FakeAPIServer(FakeAPIConfig(seed=0)) as server:
+        yield server
+
+
+def test_entsoe_contract(server, monkeypatch):
+    """The ENTSO-E client parses the fake documents on both sides of THRESHOLD."""
+    monkeypatch.setattr(entsoe_api, "URL", server.url + "/api")
+    client = EntsoeHourlyClient(api_key="FAKE")
+
+    start = THRESHOLD - pd.DateOffset(hours=2)
+    end = THRESHOLD + pd.DateOffset(hours=2)
+    ts = client.get_hourly_load(start=start, end=end)
+
+    assert len(ts) == 4
+    assert ts["load"].notna().all()
+    assert ts.equals(client.get_hourly_load(start, end, detect_resolution=True))
+
+
+def test_rte_and_open_meteo_contracts(server):
+    token = requests.post(server.url + "/token/oauth/").json()
+    assert token["access_token"]
+
+    consumption = requests.get(
+        server.url + "/open_api/consumption/v1/short_term",
+        params={
+            "type": "REALISED",
+            "start_date": "2025-10-01T00:00:00+02:00",
+            "end_date": "2025-10-03T00:00:00+02:00",
+        },
+    ).json()["short_term"]
+    assert [p["type"] for p in consumption] == ["REALISED"]
+    assert len(consumption[0]["values"]) == 2 * 96
+
+    weather = requests.get(
+        server.url + "/v1/archive",
+        params={
+            "latitude": 48.8566,
+            "longitude": 2.3522,
+            "start_date": "2025-08-04",
+            "end_date": "2025-08-05",
+            "hourly": "temperature_2m",
+        },
+    ).json()["hourly"]
+    assert len(weather["time"]) == len(weather["temperature_2m"]) == 48
+
+
+def test_throttling_and_errors():
+    config = FakeAPIConfig(throttle_rate=0.3, error_rate=0.3, retry_after=2, seed=0)
+    with FakeAPIServer(config) as server:
+        responses = [requests.post(server.url + "/token/oauth/") for _ in range(50)]
+
+    statuses = {r.status_code for r in responses}
+    assert statuses == {200, 429, 500}
+    throttled = next(r for r in responses if r.status_code == 429)
+    assert throttled.headers["Retry-After"] == "2"
+
+
+def test_run_scenario_reports_latency_percentiles():
+    stats = run_scenario(lambda i: i, calls=20, concurrency=4)
+
+    assert stats["calls"] == 20
+    assert stats["errors"] == 0
+    assert stats["p50"] <= stats["p95"] <= stats["p99"]
@@ -0,0 +1,89 @@
+import numpy as np
+import pandas as pd
+
+from imputation import find_gaps, gap_lengths, impute
+
+
+def _frame(hours: int = 24 * 14) -> pd.DataFrame:
+    index = pd.date_range("2024-01-01", periods=hours, freq="1h", tz="UTC")
+    t = np.arange(hours, dtype=float)
+    return pd.DataFrame(
+        {"load": 50_000 + 5_000 * np.sin(2 * np.pi * t / 24), "temp": t / 10},
+        index=index,
+    )
+
+
+def test_gap_lengths():
+    mask = np.array(
+        [[1, 0], [1, 0], [0, 1], [1, 1], [0, 1]],
+        dtype=bool,
+    )
+    expected = np.array([[2, 0], [2, 0], [0, 3], [1, 3], [0, 3]])
+    np.testing.assert_array_equal(gap_lengths(mask), expected)
+
+
+def test_find_gaps():
+    df = _frame(10)
+    df.iloc[0:2, 0] = np.nan
+    df.iloc[5, 0] = np.nan
+    df.iloc[3:10, 1] = np.nan
+
+    gaps = find_gaps(df)
+
+    assert gaps["column"].tolist() == ["load", "load", "temp"]
+    assert gaps["length"].tolist() == [2, 1, 7]
+    assert gaps["start"].tolist() == [df.index[0], df.index[5], df.index[3]]
+    assert gaps["end"].tolist() == [df.index[1], df.index[5], df.index[9]]
+
+
+def test_impute_policies():
+    df = _frame()
+    expected = df.copy()
+    df.iloc[200:202, 0] = np.nan  # short: linear
+    df.iloc[250:260, 0] = np.nan  # long: same hour last week
+    df.iloc[100:110, 1] = np.nan  # long, but nothing one week before
+
+    filled, gaps = impute(df)
+
+    assert not filled[["load", "temp"]].isna().any().any()
+    linear = np.interp([200, 201], [199, 202], expected["load"].iloc[[199, 202]])
+    np.testing.assert_allclose(filled["load"].iloc[200:202], linear)
+    np.testing.assert_allclose(
+        filled["load"].iloc[250:260], expected["load"].iloc[250 - 168 : 260 - 168]
+    )
+    np.testing.assert_allclose(filled["temp"], expected["temp"])
+    assert gaps["method"].tolist() == ["linear", "seasonal", "fallback"]
+
+
+def test_impute_gap_longer_than_a_week():
+    df = _frame(24 * 35)
+    expected = df.copy()
+    df.iloc[24 * 14 : 24 * 30, 0] = np.nan  # 16 days
+
+    filled, gaps = impute(df)
+
+    np.testing.assert_allclose(filled["load"], expected["load"])
+    assert gaps["method"].tolist() == ["seasonal"]
+
+    # only one week back: the end of the gap has no seasonal value
+    _, gaps = impute(df, seasonal_weeks=1)
+    assert gaps["method"].tolist() == ["fallback"]
+
+
+def test_impute_regularizes_index():
+    df = _frame().drop(index=_frame().index[[10, 11]])
+
+    filled, gaps = impute(df)
+
+    assert len(filled) == 24 * 14
+    assert gaps["length"].tolist() == [2, 2]
+    assert not filled.isna().any().any()
+
+
+def test_impute_without_gaps():
+    df = _frame()
+
+    filled, gaps = impute(df)
+
+    pd.testing.assert_frame_equal(filled, df.asfreq("1h"))
+    assert gaps.empty
@@ -65,3 +65,23 @@ def test_get_averaged(client):
 Freq: h, Name: temp, dtype: float64\
 """
     )
+
+
+def test_cache_is_keyed_by_coordinates(client, monkeypatch):
+    calls = []
+
+    def fetch(city_name, lat, lon, start, end):
+        calls.append((city_name, lat, lon))
+        index = pd.date_range(start.floor("D"), end.ceil("D"), freq="1h")
+        return pd.Series(lat, index=index, name=city_name)
+
+    monkeypatch.setattr(client, "_fetch", fetch)
+    start = pd.Timestamp("2025-08-04", tz="CET")
+    end = start + pd.DateOffset(hours=24)
+
+    client.get_city("paris", 48.8566, 2.3522, start, end)
+    client.get_city("paris", 48.8566, 2.3522, start, end)
+    ts = client.get_city("paris", 45.0, 2.3522, start, end)
+
+    assert calls == [("paris", 48.8566, 2.3522), ("paris", 45.0, 2.3522)]
+    assert (ts == 45.0).all()
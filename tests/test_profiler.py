@@ -0,0 +1,86 @@
+import json
+import threading
+
+import numpy as np
+import pandas as pd
+
+import profiler
+from profiler import profiled, profiling, stage
+from utils import format_ts
+
+
+@profiled()
+def allocate(n: int) -> int:
+    return len(np.ones(n))
+
+
+def test_disabled_profiler_is_a_noop():
+    assert profiler._active is None
+    with stage("anything"):
+        pass
+    assert allocate(10) == 10
+
+
+def test_stages_are_timed_and_memory_traced():
+    with profiling() as prof:
+        with stage("outer"):
+            allocate(1_000_000)
+            allocate(10)
+
+    assert prof.stats["allocate"].calls == 2
+    assert prof.stats["outer"].calls == 1
+    # 8 MB array allocated by the inner stage is seen by both stages
+    assert prof.stats["allocate"].peak_bytes >= 8_000_000
+    assert prof.stats["outer"].peak_bytes >= 8_000_000
+    assert prof.stats["outer"].seconds >= prof.stats["allocate"].seconds
+    assert profiler._active is None
+
+
+def test_stages_in_threads():
+    """Each thread nests its own stages, memory is measured process-wide."""
+    barrier = threading.Barrier(4)
+
+    def worker():
+        with stage("http"):
+            data = np.ones(2_000_000)  # 16 MB
+            barrier.wait()
+            with stage("parse"):
+                data.sum()
+
+    with profiling() as prof:
+        with stage("outer"):
+            threads = [threading.Thread(target=worker) for _ in range(4)]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+        main_stack = prof._stack()
+
+    assert prof.stats["http"].calls == prof.stats["parse"].calls == 4
+    assert prof.stats["outer"].calls == 1
+    assert main_stack == []
+    # the four arrays were alive at the same time
+    assert prof.stats["outer"].peak_bytes >= 4 * 16_000_000
+    assert prof.stats["http"].peak_bytes >= 16_000_000
+
+
+def test_pipeline_functions_are_instrumented():
+    idx = pd.date_range("2025-11-04 10:00", periods=3, freq="h", tz="UTC")
+    ts = pd.Series([1, 2, 3], index=idx)
+
+    with profiling() as prof:
+        format_ts(ts, idx[0], idx[-1])
+
+    assert prof.stats["format_ts"].calls == 1
+
+
+def test_report_and_json():
+    with profiling(cprofile=True) as prof:
+        allocate(100)
+
+    report = prof.report()
+    data = json.loads(prof.to_json())
+
+    assert report.splitlines()[1].startswith("allocate")
+    assert data["stages"]["allocate"]["calls"] == 1
+    assert data["cprofile"]
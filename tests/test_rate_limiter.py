@@ -0,0 +1,226 @@
+import asyncio
+import threading
+import time
+
+import pytest
+import requests
+
+from rate_limiter import (
+    RTE_QUOTA,
+    AdaptiveConcurrency,
+    HostLimiter,
+    HostQuota,
+    TokenBucket,
+    get_limiter,
+)
+
+
+def make_response(status_code: int, retry_after: str | None = None):
+    resp = requests.Response()
+    resp.status_code = status_code
+    if retry_after is not None:
+        resp.headers["Retry-After"] = retry_after
+    return resp
+
+
+def test_token_bucket_enforces_rate():
+    """Requests beyond the burst are spaced by 1 / rate."""
+    bucket = TokenBucket(rate=50.0, capacity=1)
+
+    t0 = time.monotonic()
+    for _ in range(6):
+        bucket.acquire()
+
+    assert time.monotonic() - t0 >= 5 / 50 * 0.9
+
+
+def test_aimd_increase_and_decrease():
+    """Fast successes grow the limit, throttling halves it."""
+    ctrl = AdaptiveConcurrency(initial=2, maximum=10)
+    for _ in range(20):
+        ctrl.acquire()
+        ctrl.release(latency=0.01)
+    assert ctrl.limit > 4
+
+    before = ctrl.limit
+    ctrl.acquire()
+    ctrl.release(throttled=True)
+    assert ctrl.limit == pytest.approx(before / 2)
+
+
+def test_aimd_decreases_on_latency_spike():
+    ctrl = AdaptiveConcurrency(initial=4, maximum=10)
+    for _ in range(10):
+        ctrl.acquire()
+        ctrl.release(latency=0.01)
+    before = ctrl.limit
+
+    ctrl.acquire()
+    ctrl.release(latency=1.0)
+
+    assert ctrl.limit == pytest.approx(before / 2)
+
+
+def test_aimd_mixed_request_sizes_do_not_collapse():
+    """Slow large queries among fast small ones only halve the limit once."""
+    ctrl = AdaptiveConcurrency(initial=8, maximum=8)
+    for i in range(200):
+        ctrl.acquire()
+        ctrl.release(latency=2.0 if i % 4 == 3 else 0.05)
+
+    assert ctrl.limit >= 4
+
+
+def test_aimd_burst_of_throttled_responses_halves_once():
+    """Every request in flight throttled at once: one decrease, not eight."""
+    ctrl = AdaptiveConcurrency(initial=8, maximum=8)
+    for _ in range(8):
+        ctrl.acquire()
+    for _ in range(8):
+        ctrl.release(throttled=True)
+    assert ctrl.limit == 4
+
+    # a request sent after the decrease is a new congestion signal
+    ctrl.acquire()
+    ctrl.release(throttled=True)
+    assert ctrl.limit == 2
+
+
+def test_concurrency_limit_is_shared_between_threads():
+    limiter = HostLimiter(
+        HostQuota(rate=1000, burst=1000, max_concurrency=2, initial_concurrency=2)
+    )
+    in_flight, peak = 0, 0
+    lock = threading.Lock()
+
+    def work():
+        nonlocal in_flight, peak
+        with limiter.throttle():
+            with lock:
+                in_flight += 1
+                peak = max(peak, in_flight)
+            time.sleep(0.02)
+            with lock:
+                in_flight -= 1
+
+    threads = [threading.Thread(target=work) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert peak <= 2
+
+
+def test_throttled_response_backs_off():
+    """A 429 halves the concurrency and pauses the bucket for Retry-After."""
+    limiter = HostLimiter(
+        HostQuota(rate=1000, burst=1000, max_concurrency=8, initial_concurrency=4)
+    )
+
+    with limiter.throttle() as permit:
+        permit.observe(make_response(429, retry_after="0.1"))
+
+    assert limiter.concurrency.limit == 2
+    assert limiter.bucket._reserve() > 0.05
+
+
+def test_http_error_raised_in_block_is_observed():
+    limiter = HostLimiter(
+        HostQuota(rate=1000, burst=1000, max_concurrency=8, initial_concurrency=4)
+    )
+
+    with pytest.raises(requests.HTTPError):
+        with limiter.throttle():
+            raise requests.HTTPError(response=make_response(503, retry_after="0"))
+
+    assert limiter.concurrency.limit == 2
+    assert limiter.concurrency.in_flight == 0
+
+
+def test_async_and_threads_share_the_same_budget():
+    limiter = HostLimiter(
+        HostQuota(rate=1000, burst=1000, max_concurrency=1, initial_concurrency=1)
+    )
+
+    async def main():
+        async with limiter.athrottle():
+            assert limiter.concurrency.in_flight == 1
+            # a thread cannot get a slot while the coroutine holds it
+            assert not limiter.concurrency._try_acquire()
+
+    asyncio.run(main())
+    assert limiter.concurrency.in_flight == 0
+
+
+def test_get_limiter_is_per_host():
+    a = get_limiter("https://archive-api.open-meteo.com/v1/archive?latitude=1")
+    b = get_limiter("https://archive-api.open-meteo.com/v1/forecast")
+    c = get_limiter("https://web-api.tp.entsoe.eu/api")
+
+    assert a is b
+    assert a is not c
+    assert c.quota.rate == pytest.approx(400 / 60)
+
+
+def test_zero_retry_after_does_not_pause():
+    limiter = HostLimiter(
+        HostQuota(rate=1000, burst=1000, max_concurrency=8, initial_concurrency=4)
+    )
+
+    with limiter.throttle() as permit:
+        permit.observe(make_response(429, retry_after="0"))
+
+    assert limiter.bucket._reserve() == 0
+
+
+def test_rte_quota_for_any_configured_host():
+    assert get_limiter("https://digital.iservices.rte-france.com/x").quota == RTE_QUOTA
+    # e.g. a proxy or the fake API server configured as RTE_BASE_URL
+    limiter = get_limiter("http://rte-proxy.local:8080/open_api/", RTE_QUOTA)
+    assert limiter.quota == RTE_QUOTA
+
+
+def test_call_retries_throttled_requests():
+    limiter = HostLimiter(
+        HostQuota(rate=1000, burst=1000, max_concurrency=8, initial_concurrency=4)
+    )
+    responses = iter(
+        [make_response(429, retry_after="0.05"), make_response(503), make_response(200)]
+    )
+
+    def send():
+        response = next(responses)
+        response.raise_for_status()
+        return response
+
+    t0 = time.monotonic()
+    response = limiter.call(send)
+
+    assert response.status_code == 200
+    # waited for Retry-After before the first retry
+    assert time.monotonic() - t0 >= 0.05
+    assert limiter.concurrency.in_flight == 0
+
+
+def test_call_gives_up_after_max_retries():
+    limiter = HostLimiter(HostQuota(rate=1000, burst=1000, max_concurrency=8))
+    calls = []
+
+    def send():
+        calls.append(1)
+        return make_response(429, retry_after="0")
+
+    assert limiter.call(send, max_retries=2).status_code == 429
+    assert len(calls) == 3
+
+    # other errors are not retried
+    calls.clear()
+
+    def bad_request():
+        calls.append(1)
+        raise requests.HTTPError(response=make_response(400))
+
+    with pytest.raises(requests.HTTPError):
+        limiter.call(bad_request)
+    assert len(calls) == 1
@@ -0,0 +1,126 @@
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from revision_store import RevisionStore
+
+SERIES = "consumption/REALISED"
+
+
+def revisions(updated_date: str, values: list[float], start="2025-10-01 00:00"):
+    start_dates = pd.date_range(start, periods=len(values), freq="15min", tz="CET")
+    return pd.DataFrame(
+        {
+            "start_date": start_dates,
+            "updated_date": pd.Timestamp(updated_date, tz="CET"),
+            "value": values,
+        }
+    )
+
+
+@pytest.fixture
+def store():
+    store = RevisionStore()
+    store.append(SERIES, revisions("2025-10-01 01:00", [10.0, 20.0, 30.0]))
+    # second publication revises the last period and adds a new one
+    store.append(SERIES, revisions("2025-10-01 02:00", [10.0, 20.0, 35.0, 40.0]))
+    return store
+
+
+def test_latest_and_as_of(store):
+    assert store.latest(SERIES).tolist() == [10.0, 20.0, 35.0, 40.0]
+    assert store.as_of(SERIES, pd.Timestamp("2025-10-01 01:30", tz="CET")).tolist() == [
+        10.0,
+        20.0,
+        30.0,
+    ]
+    assert store.as_of(SERIES, pd.Timestamp("2025-10-01 00:30", tz="CET")).empty
+
+
+def test_append_only_stores_new_versions(store):
+    assert len(store.revisions(SERIES)) == 7
+    assert store.append(SERIES, revisions("2025-10-01 02:00", [10.0, 20.0])) == 0
+
+
+def test_range_query(store):
+    start = pd.Timestamp("2025-10-01 00:15", tz="CET")
+    end = pd.Timestamp("2025-10-01 00:45", tz="CET")
+
+    assert store.latest(SERIES, start, end).tolist() == [20.0, 35.0]
+
+
+def test_persistence_and_compaction(tmp_path):
+    store = RevisionStore(tmp_path)
+    store.append(SERIES, revisions("2025-10-01 01:00", [10.0, 20.0]))
+    store.append(SERIES, revisions("2025-10-01 02:00", [11.0, 20.0]))
+    assert len(list(tmp_path.glob("segment-*.parquet"))) == 2
+
+    store.compact()
+    assert [p.name for p in tmp_path.glob("segment-*.parquet")] == [
+        "segment-000002.parquet"
+    ]
+    # numbered after the compacted segment, which it must not overwrite
+    store.append("other", revisions("2025-10-01 02:00", [1.0]))
+    assert len(list(tmp_path.glob("segment-*.parquet"))) == 2
+
+    reloaded = RevisionStore(tmp_path)
+    assert reloaded.series() == [SERIES, "other"]
+    assert reloaded.latest(SERIES).tolist() == [11.0, 20.0]
+    assert len(reloaded.revisions(SERIES)) == 4
+
+
+def test_interrupted_compaction_loses_nothing(tmp_path, monkeypatch):
+    store = RevisionStore(tmp_path)
+    store.append(SERIES, revisions("2025-10-01 01:00", [10.0, 20.0]))
+    store.append(SERIES, revisions("2025-10-01 02:00", [11.0, 20.0]))
+
+    def crash(self, missing_ok=False):
+        raise OSError("crash")
+
+    # crash before the old segments are deleted
+    monkeypatch.setattr(Path, "unlink", crash)
+    with pytest.raises(OSError):
+        store.compact()
+    monkeypatch.undo()
+
+    reloaded = RevisionStore(tmp_path)
+    assert len(reloaded.revisions(SERIES)) == 4
+    reloaded.compact()
+    assert len(list(tmp_path.glob("segment-*.parquet"))) == 1
+    assert RevisionStore(tmp_path).latest(SERIES).tolist() == [11.0, 20.0]
+
+
+def test_refresh_start(store):
+    """Refetch from the end of the stored data or the revision horizon."""
+    now = pd.Timestamp("2025-10-10", tz="CET")
+    assert store.refresh_start(SERIES, now) == pd.Timestamp(
+        "2025-10-01 00:45", tz="CET"
+    )
+
+    now = pd.Timestamp("2025-10-02", tz="CET")
+    assert store.refresh_start(SERIES, now) == now - pd.Timedelta(days=3)
+    assert store.refresh_start("unknown", now) is None
+
+
+def test_appends_keep_versions_sorted():
+    """Interleaved appends give the same rows as one sorted load."""
+    store = RevisionStore()
+    store.append("b", revisions("2025-10-01 03:00", [1.0, 2.0]))
+    store.append(SERIES, revisions("2025-10-01 04:00", [5.0, 6.0, 7.0, 8.0]))
+    # older publication of the middle periods, then a new series before both
+    store.append(
+        SERIES, revisions("2025-10-01 01:00", [1.0, 2.0], start="2025-10-01 00:15")
+    )
+    store.append("a", revisions("2025-10-01 02:00", [3.0]))
+
+    versions = store._versions
+    assert versions.equals(RevisionStore._sort(versions.sample(frac=1, random_state=0)))
+    assert store.series() == ["a", "b", SERIES]
+    assert store.revisions(SERIES)["value"].tolist() == [5.0, 1.0, 6.0, 2.0, 7.0, 8.0]
+
+    start = pd.Timestamp("2025-10-01 00:15", tz="CET")
+    end = pd.Timestamp("2025-10-01 00:45", tz="CET")
+    assert store.latest(SERIES, start, end).tolist() == [6.0, 7.0]
+    before = pd.Timestamp("2025-10-01 03:00", tz="CET")
+    assert store.as_of(SERIES, before, start, end).tolist() == [1.0, 2.0]
@@ -0,0 +1,125 @@
+import numpy as np
+import pandas as pd
+import pytest
+from pandas.testing import assert_series_equal
+
+from rollup_store import RollupStore
+
+
+@pytest.fixture
+def consumption():
+    idx = pd.date_range("2025-01-30", "2025-03-02", freq="15min", tz="CET")
+    rng = np.random.default_rng(0)
+    return pd.Series(rng.normal(50_000, 5_000, len(idx)), index=idx)
+
+
+@pytest.mark.parametrize("freq", ["1h", "6h", "1D", "W", "MS"])
+def test_query_matches_resampling_raw_data(consumption, freq):
+    store = RollupStore()
+    store.append("load", consumption)
+
+    for agg in ["mean", "min", "max", "count"]:
+        expected = consumption.resample(freq).agg(agg).astype(float)
+        result = store.query("load", freq, agg=agg)
+        assert_series_equal(result, expected, check_names=False, check_freq=False)
+
+
+@pytest.mark.parametrize("freq", ["1D", "24h", "48h"])
+def test_query_across_dst_change(freq):
+    """Fixed durations are not local days: 2025-03-30 lasts 23 hours in CET."""
+    idx = pd.date_range("2025-03-01", "2025-04-30", freq="15min", tz="CET")
+    ts = pd.Series(np.arange(len(idx), dtype=float), index=idx)
+    store = RollupStore()
+    store.append("load", ts)
+
+    result = store.query("load", freq, agg=["sum", "count"])
+    expected = ts.resample(freq).agg(["sum", "count"]).astype(float)
+    pd.testing.assert_frame_equal(result, expected, check_freq=False)
+
+
+def test_incremental_append_equals_bulk_append(consumption):
+    bulk = RollupStore()
+    bulk.append("load", consumption)
+
+    incremental = RollupStore()
+    for bounds in np.array_split(np.arange(len(consumption)), 7):
+        incremental.append("load", consumption.iloc[bounds])
+    # revised values overwrite the previous ones
+    revision = consumption.iloc[100:110] + 1000
+    incremental.append("load", revision)
+    bulk.append("load", revision)
+
+    for level in ["hourly", "daily", "monthly"]:
+        pd.testing.assert_frame_equal(
+            incremental.rollup("load", level),
+            bulk.rollup("load", level),
+            check_freq=False,
+        )
+    assert incremental.query("load", "MS", agg="count").sum() == len(consumption)
+
+
+def test_query_sub_resolution_reads_raw(consumption):
+    store = RollupStore()
+    store.append("load", consumption)
+
+    result = store.query("load", "30min", agg="mean")
+
+    expected = consumption.resample("30min").mean()
+    assert_series_equal(result, expected, check_names=False, check_freq=False)
+
+
+def test_persistence(tmp_path, consumption):
+    RollupStore(tmp_path).append("load", consumption)
+
+    store = RollupStore(tmp_path)
+
+    assert store.series() == ["load"]
+    assert_series_equal(
+        store.query("load", "1D"),
+        consumption.resample("1D").mean(),
+        check_names=False,
+        check_freq=False,
+    )
+
+
+def test_unknown_aggregation_raises(consumption):
+    store = RollupStore()
+    store.append("load", consumption)
+    with pytest.raises(ValueError, match="aggregation"):
+        store.query("load", "1h", agg="median")
+
+
+@pytest.mark.parametrize("freq", ["30min", "1h", "1D", "W", "MS"])
+def test_query_bounds_clip_partial_buckets(consumption, freq):
+    """Only the points in [start, end) count, whatever the level used."""
+    store = RollupStore()
+    store.append("load", consumption)
+    start = pd.Timestamp("2025-02-01 12:00", tz="CET")
+    end = pd.Timestamp("2025-02-18 12:15", tz="CET")
+
+    result = store.query("load", freq, start, end, agg=["count", "mean"])
+
+    clipped = consumption[(consumption.index >= start) & (consumption.index < end)]
+    expected = clipped.resample(freq).agg(["count", "mean"]).astype(float)
+    pd.testing.assert_frame_equal(result, expected, check_freq=False)
+
+
+def test_append_only_rewrites_touched_partitions(tmp_path, consumption):
+    store = RollupStore(tmp_path)
+    store.append("load", consumption[consumption.index < "2025-02-15"])
+    january = {
+        p: p.stat().st_mtime_ns
+        for p in tmp_path.glob("load/*/*.parquet")
+        if "2025-01" in p.name
+    }
+
+    store.append("load", consumption[consumption.index >= "2025-02-15"])
+
+    assert january
+    assert all(p.stat().st_mtime_ns == mtime for p, mtime in january.items())
+    assert_series_equal(
+        RollupStore(tmp_path).query("load", "MS", agg="count"),
+        consumption.resample("MS").count().astype(float),
+        check_names=False,
+        check_freq=False,
+    )
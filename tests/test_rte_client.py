@@ -1,10 +1,36 @@
+import json
+from pathlib import Path
+
 import pandas as pd
 import vcr
 from inline_snapshot import snapshot
 
-from rte_client import RTEClient
+from config import PrevisionType
+from fake_api_server import FakeAPIConfig, FakeAPIServer
+from revision_store import RevisionStore, refresh_consumption, refresh_power_exchanges
+from rte_client import RTEClient, _rte_revisions
 
 VCR_DIR = "tests/cassettes/"
+JSON_DIR = Path("tests/json")
+
+
+class JSONResponse:
+    """Response serving one of the payloads of `JSON_DIR`."""
+
+    def __init__(self, name: str):
+        self.payload = json.loads((JSON_DIR / name).read_text())
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return self.payload
+
+
+def client_serving(monkeypatch, name: str) -> RTEClient:
+    client = RTEClient(use_cache_file=False)
+    monkeypatch.setattr(client, "request", lambda *args, **kwargs: JSONResponse(name))
+    return client
 
 
 @vcr.use_cassette(f"{VCR_DIR}test_realised_consumption_one_day.yaml")
@@ -29,3 +55,87 @@ def test_realised_consumption_one_day():
 2020-01-01 23:45:00+01:00    63322
 Freq: 15min, Name: value, Length: 96, dtype: int64\
 """)
+
+
+def test_rte_revisions_keeps_every_version():
+    values = JSONResponse("ID.json").payload["short_term"][0]["values"]
+    revised = {**values[0], "updated_date": "2025-10-01T00:05:00+02:00", "value": 44100}
+    df = _rte_revisions([revised, *values, values[1]])
+
+    assert list(df.columns) == ["start_date", "updated_date", "value"]
+    assert str(df["start_date"].dt.tz) == "UTC"
+    assert len(df) == 5
+    # both versions of the first period, oldest first
+    assert df["value"].tolist()[:2] == [44000, 44100]
+    assert df["start_date"].is_monotonic_increasing
+
+
+def test_short_term_consumption_revisions(monkeypatch):
+    client = client_serving(monkeypatch, "consumptions.json")
+    start = pd.Timestamp("2025-10-01", tz="CET")
+    previsions = client.get_short_term_consumption_revisions(
+        types=[PrevisionType.REALISED, PrevisionType.ID], start=start, end=start
+    )
+
+    assert set(previsions) == {PrevisionType.REALISED, PrevisionType.ID}
+    assert len(previsions[PrevisionType.REALISED]) == 6
+    forecast = previsions[PrevisionType.ID]
+    assert forecast["value"].tolist() == [44000, 43800, 42200, 40300]
+    assert forecast["updated_date"].iloc[0] == pd.Timestamp("2025-09-30T23:43:47+02:00")
+
+
+def test_france_power_exchange_revisions(monkeypatch):
+    client = client_serving(monkeypatch, "power_exchanges.json")
+    df = client.get_france_power_exchange_revisions()
+
+    assert list(df.columns) == ["start_date", "updated_date", "value", "price"]
+    assert len(df) == 5
+    # values are published per day: they get the date of their day
+    assert (df["updated_date"] == pd.Timestamp("2025-11-02T13:23:28+01:00")).all()
+    assert df["price"].iloc[0] == 69.32
+
+
+def test_refresh_consumption(monkeypatch):
+    client = client_serving(monkeypatch, "consumption.json")
+    store = RevisionStore()
+    now = pd.Timestamp("2025-10-02", tz="CET")
+    start = pd.Timestamp("2025-10-01", tz="CET")
+
+    assert refresh_consumption(store, client, start=start, now=now) == 5
+    # same publication: nothing new
+    assert refresh_consumption(store, client, now=now) == 0
+    latest = store.latest("consumption/REALISED")
+    assert latest.index[0] == start
+    assert latest.iloc[0] == 44345
+
+
+def test_refresh_power_exchanges(monkeypatch):
+    client = client_serving(monkeypatch, "power_exchanges.json")
+    store = RevisionStore()
+
+    assert refresh_power_exchanges(store, client) == 10
+    assert refresh_power_exchanges(store, client) == 0
+    assert store.series() == ["power_exchanges/price", "power_exchanges/value"]
+    assert store.latest("power_exchanges/price").iloc[0] == 69.32
+
+
+def test_client_against_fake_server():
+    """The fake server replays the recorded payloads through the real client."""
+    config = FakeAPIConfig(recorded_dir=JSON_DIR, seed=0)
+    with FakeAPIServer(config) as server:
+        client = RTEClient(api_base=server.url, use_cache_file=False)
+        start = pd.Timestamp("2025-10-01", tz="CET")
+        previsions = client.get_short_term_consumption_revisions(
+            types=PrevisionType.ID, start=start, end=start + pd.DateOffset(days=1)
+        )
+        exchanges = client.get_france_power_exchanges()
+
+    assert list(previsions) == [PrevisionType.ID]
+    assert previsions[PrevisionType.ID]["value"].tolist() == [
+        44000,
+        43800,
+        42200,
+        40300,
+    ]
+    assert exchanges["price"].iloc[0] == 69.32
+    assert server.status_counts == {200: server.requests_count}
@@ -1,10 +1,11 @@
 from datetime import timezone
 
+import numpy as np
 import pandas as pd
 import pytest
-from pandas.testing import assert_series_equal
+from pandas.testing import assert_frame_equal, assert_series_equal
 
-from utils import format_ts
+from utils import format_ts, resolution_segments, to_hourly
 
 
 @pytest.fixture
@@ -78,3 +79,46 @@ def test_format_ts_inserts_nan_if_missing(base_series):
 
     assert result.isna().sum() == 1
     assert result.index.tz == timezone.utc
+
+
+def test_resolution_segments_mixed_index():
+    """It should split an index into runs of constant resolution."""
+    hourly = pd.date_range("2024-12-30 22:00", periods=2, freq="h", tz="UTC")
+    quarters = pd.date_range("2024-12-31 00:00", periods=8, freq="15min", tz="UTC")
+    # a missing quarter must not be seen as 30-min data
+    index = hourly.append(quarters.delete(5))
+
+    segments = resolution_segments(index)
+
+    assert segments["resolution"].tolist() == [
+        pd.Timedelta("1h"),
+        pd.Timedelta("15min"),
+    ]
+    assert segments["points"].tolist() == [2, 7]
+    assert segments["start"].iloc[1] == quarters[0]
+
+
+def test_to_hourly_weights_by_resolution():
+    """It should average sub-hourly points and keep hourly ones unchanged."""
+    hourly = pd.date_range("2024-12-30 23:00", periods=1, freq="h", tz="UTC")
+    quarters = pd.date_range("2024-12-31 00:00", periods=4, freq="15min", tz="UTC")
+    df = pd.DataFrame(
+        {"load": [5.0, 1.0, np.nan, 3.0, 5.0]}, index=hourly.append(quarters)
+    )
+
+    result = to_hourly(df)
+
+    expected = pd.DataFrame(
+        {"load": [5.0, 3.0]},
+        index=pd.date_range("2024-12-30 23:00", periods=2, freq="h", tz="UTC"),
+    )
+    assert_frame_equal(result, expected, check_freq=False)
+
+
+def test_to_hourly_keeps_hourly_points_around_holes():
+    """It should not average across a missing hour of hourly data."""
+    idx = pd.DatetimeIndex(["2024-12-31 00:00", "2024-12-31 02:00"], tz="UTC")
+
+    result = to_hourly(pd.DataFrame({"load": [7.0, 9.0]}, index=idx))
+
+    assert result["load"].tolist() == [7.0, 9.0]
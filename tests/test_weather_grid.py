@@ -0,0 +1,92 @@
+import numpy as np
+import pandas as pd
+
+from weather_grid import PointCache, aggregate, weight_matrix, weighted_means
+
+
+def test_weighted_means_renormalizes_over_present_points():
+    values = np.array(
+        [[10.0, 20.0, 30.0], [np.nan, 20.0, 30.0], [np.nan, np.nan, np.nan]],
+        dtype=np.float32,
+    )
+    weights = np.array([[0.5, 1.0], [0.3, 0.0], [0.2, 0.0]])
+
+    means = weighted_means(values, weights)
+
+    np.testing.assert_allclose(means[0], [10 * 0.5 + 20 * 0.3 + 30 * 0.2, 10.0])
+    # paris is missing: the other weights are renormalized, not summed
+    np.testing.assert_allclose(means[1, 0], (20 * 0.3 + 30 * 0.2) / 0.5)
+    assert np.isnan(means[1, 1])
+    assert np.isnan(means[2]).all()
+
+
+def test_aggregate_named_weightings():
+    index = pd.date_range("2025-01-01", periods=3, freq="1h", tz="UTC")
+    frame = pd.DataFrame(
+        {"paris": [10.0, np.nan, 12.0], "lyon": [20.0, 21.0, 22.0]}, index=index
+    )
+    weightings = {
+        "population": {"paris": 0.75, "lyon": 0.25},
+        "heating": {"lyon": 1.0, "marseille": 1.0},
+    }
+
+    result = aggregate(frame, weightings)
+
+    assert list(result.columns) == ["population", "heating"]
+    np.testing.assert_allclose(result["population"], [12.5, 21.0, 14.5])
+    np.testing.assert_allclose(result["heating"], frame["lyon"])
+    assert weight_matrix(["paris", "lyon"], weightings).shape == (2, 2)
+
+
+def hourly_fetch(calls):
+    def fetch(start, end):
+        calls.append((start, end))
+        index = pd.date_range(start, end, freq="1h", inclusive="left")
+        return pd.Series(index.hour.to_numpy(dtype=float), index=index)
+
+    return fetch
+
+
+def test_point_cache_only_fetches_missing_ranges():
+    calls = []
+    fetch = hourly_fetch(calls)
+    cache = PointCache()
+    day = pd.Timestamp("2025-01-02", tz="UTC")
+    one_day = pd.Timedelta("1D")
+
+    cache.get("paris", day, day + one_day, fetch)
+    cache.get("paris", day + pd.Timedelta("6h"), day + pd.Timedelta("12h"), fetch)
+    series = cache.get("paris", day - one_day, day + 2 * one_day, fetch)
+
+    assert calls == [
+        (day, day + one_day),
+        (day - one_day, day),
+        (day + one_day, day + 2 * one_day),
+    ]
+    assert series.index.is_monotonic_increasing
+    assert len(series) == 72
+
+
+def test_point_cache_is_bounded():
+    """Walking through a long history keeps at most `max_points` per point."""
+    calls = []
+    fetch = hourly_fetch(calls)
+    cache = PointCache(max_points=24 * 3)
+    day = pd.Timestamp("2025-01-01", tz="UTC")
+    one_day = pd.Timedelta("1D")
+
+    for i in range(10):
+        start = day + i * one_day
+        series = cache.get("paris", start, start + one_day, fetch)
+        assert len(series) <= 24 * 3
+        assert series.index.is_monotonic_increasing
+        assert series.index[0] <= start and series.index[
+            -1
+        ] >= start + 23 * pd.Timedelta("1h")
+    assert len(calls) == 10
+
+    # evicted range is fetched again, a distant request replaces the cache
+    cache.get("paris", day, day + one_day, fetch)
+    assert calls[-1] == (day, day + one_day)
+    assert len(cache.get("paris", day, day + one_day, fetch)) == 24
+    assert len(calls) == 11
@@ -1,6 +1,10 @@
+import numpy as np
 import pandas as pd
 
+from profiler import profiled
 
+
+@profiled()
 def format_ts(
     ts: pd.Series,
     start: pd.Timestamp,
@@ -85,3 +89,82 @@ def format_ts(
         raise ValueError(f"Reindexing failed: {e}")
 
     return ts
+
+
+def native_resolution(index: pd.DatetimeIndex) -> pd.TimedeltaIndex:
+    """
+    Detect the sampling step of every point of a (sorted) DatetimeIndex.
+
+    The step of a point is the smallest distance to one of its neighbours, so
+    a hole in a 15-min series does not make the points around it look like
+    30-min data, and the first point of a finer segment is not absorbed by the
+    coarser segment before it.
+
+    Parameters
+    ----------
+    index : pd.DatetimeIndex
+        Sorted index of the raw timeseries.
+
+    Returns
+    -------
+    pd.TimedeltaIndex
+        Resolution of each point (same length as ``index``). A single point
+        is assumed to be hourly.
+    """
+    if len(index) < 2:
+        return pd.TimedeltaIndex([pd.Timedelta("1h")] * len(index))
+
+    steps = np.diff(index.as_unit("ns").asi8)
+    forward = np.append(steps, steps[-1])
+    backward = np.insert(steps, 0, steps[0])
+    return pd.to_timedelta(np.minimum(forward, backward), unit="ns")
+
+
+def resolution_segments(index: pd.DatetimeIndex) -> pd.DataFrame:
+    """
+    Run-length encode the native resolution of ``index``.
+
+    Returns
+    -------
+    pd.DataFrame
+        One row per segment of constant resolution with columns
+        'start', 'end' (last point of the segment), 'resolution' and 'points'.
+    """
+    resolution = native_resolution(index)
+    if len(resolution) == 0:
+        return pd.DataFrame(columns=["start", "end", "resolution", "points"])
+
+    values = resolution.as_unit("ns").asi8
+    starts = np.flatnonzero(np.r_[True, values[1:] != values[:-1]])
+    ends = np.r_[starts[1:], len(values)] - 1
+    return pd.DataFrame(
+        {
+            "start": index[starts],
+            "end": index[ends],
+            "resolution": resolution[starts],
+            "points": ends - starts + 1,
+        }
+    )
+
+
+@profiled()
+def to_hourly(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Downsample a raw timeseries of any (possibly mixed) sub-hourly resolution
+    to hourly means in a single vectorized pass.
+
+    Each point is weighted by its native resolution so that hourly, 30-min and
+    15-min segments can coexist in the same frame. Missing values are skipped,
+    hours without any value are NaN. Steps longer than one hour only happen
+    around holes in hourly data and are weighted as one hour.
+    """
+    seconds = np.minimum(native_resolution(df.index).total_seconds(), 3600.0)
+
+    values = df.to_numpy(dtype=float)
+    weights = np.where(np.isnan(values), 0.0, np.asarray(seconds)[:, None])
+    hours = df.index.floor("h")
+    num = pd.DataFrame(np.nan_to_num(values) * weights, index=hours).groupby(level=0)
+    den = pd.DataFrame(weights, index=hours).groupby(level=0)
+    hourly = num.sum() / den.sum().replace(0.0, np.nan)
+    hourly.columns = df.columns
+    return hourly
@@ -0,0 +1,141 @@
+"""
+Weighted aggregation of per-point weather series (cities or grid points).
+
+Temperatures are held as one (time x points) float32 matrix and every named
+weighting (population, heating demand...) is a column of a (points x
+weightings) matrix, so all the national averages come out of one matrix
+product. Weights are renormalized at every timestamp over the points that
+have a value: a missing point no longer biases the average towards zero.
+
+Raw per-point series are kept in a bounded `PointCache`, so changing the
+weights, or asking for a sub-range, never refetches anything.
+"""
+
+from typing import Callable, Hashable
+
+import numpy as np
+import pandas as pd
+
+from profiler import profiled
+
+Weightings = dict[str, dict[str, float]]
+# Points kept per cached series: about one year of hourly values
+MAX_POINTS = 24 * 366
+
+
+class PointCache:
+    """
+    Raw series of every point, with the time range already fetched.
+
+    A request only fetches the parts of [start, end) outside of that range,
+    and the new parts are spliced at the ends of the cached series (no
+    re-sort). A series growing beyond `max_points` is cut back to the
+    range of the current request, so a client walking through a long
+    history keeps bounded memory.
+    """
+
+    def __init__(self, max_points: int | None = MAX_POINTS) -> None:
+        self.max_points = max_points
+        self._series: dict[Hashable, pd.Series] = {}
+        self._coverage: dict[Hashable, tuple[pd.Timestamp, pd.Timestamp]] = {}
+
+    def get(
+        self,
+        point: Hashable,
+        start: pd.Timestamp,
+        end: pd.Timestamp,
+        fetch: Callable[[pd.Timestamp, pd.Timestamp], pd.Series],
+    ) -> pd.Series:
+        """
+        Cached series of `point` (any hashable key, e.g. name and
+        coordinates), covering at least [start, end). `fetch` is called for
+        the missing parts only.
+        """
+        coverage = self._coverage.get(point)
+        # a request away from the cached range replaces it, the range in
+        # between is not fetched
+        if coverage is None or start > coverage[1] or end < coverage[0]:
+            series = _sorted_unique(fetch(start, end))
+            coverage = (start, end)
+        else:
+            cached_start, cached_end = coverage
+            series = self._series[point]
+            if start >= cached_start and end <= cached_end:
+                return series
+            parts = [series]
+            if start < cached_start:
+                before = _sorted_unique(fetch(start, cached_start))
+                if len(series):
+                    before = before[before.index < series.index[0]]
+                parts.insert(0, before)
+            if end > cached_end:
+                after = _sorted_unique(fetch(cached_end, end))
+                if len(series):
+                    after = after[after.index > series.index[-1]]
+                parts.append(after)
+            series = pd.concat(parts)
+            coverage = (min(start, cached_start), max(end, cached_end))
+
+        if self.max_points is not None and len(series) > self.max_points:
+            series = series[(series.index >= start) & (series.index <= end)]
+            coverage = (start, end)
+        self._series[point] = series
+        self._coverage[point] = coverage
+        return series
+
+    def clear(self) -> None:
+        self._series.clear()
+        self._coverage.clear()
+
+
+def _sorted_unique(series: pd.Series) -> pd.Series:
+    """`series` with a sorted, unique index (no-op for well-formed responses)."""
+    if not series.index.is_monotonic_increasing:
+        series = series.sort_index()
+    if series.index.has_duplicates:
+        series = series[~series.index.duplicated(keep="first")]
+    return series
+
+
+def weight_matrix(points: list[str], weightings: Weightings) -> np.ndarray:
+    """
+    (points x weightings) matrix of `weightings` ({name: {point: weight}}).
+    Points missing from a weighting get a zero weight.
+    """
+    return np.array(
+        [
+            [weights.get(point, 0.0) for weights in weightings.values()]
+            for point in points
+        ],
+        dtype=np.float64,
+    ).reshape(len(points), len(weightings))
+
+
+def weighted_means(values: np.ndarray, weights: np.ndarray) -> np.ndarray:
+    """
+    Weighted means of the rows of `values` (time x points, NaN for missing)
+    for every column of `weights` (points x weightings), with the weights
+    renormalized over the points present at each timestamp.
+
+    Returns
+    -------
+    np.ndarray
+        (time x weightings) means, NaN where no weighted point is present.
+    """
+    present = ~np.isnan(values)
+    total = np.where(present, values, 0) @ weights
+    norm = present @ weights
+    return np.divide(total, norm, out=np.full(total.shape, np.nan), where=norm != 0)
+
+
+@profiled()
+def aggregate(frame: pd.DataFrame, weightings: Weightings) -> pd.DataFrame:
+    """
+    Weighted means of the columns (points) of `frame`, one column per
+    weighting name.
+    """
+    values = frame.to_numpy(dtype=np.float32)
+    weights = weight_matrix(list(frame.columns), weightings)
+    return pd.DataFrame(
+        weighted_means(values, weights), index=frame.index, columns=list(weightings)
+    )